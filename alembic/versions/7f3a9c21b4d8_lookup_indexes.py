@@ -0,0 +1,39 @@
+"""lookup indexes
+
+GIN indexes for ``roles @> ARRAY[...]`` filters, a unique index on
+``lower(email)`` for case-insensitive logins and an index on
+``permission.name``. The email index fails if two existing users only
+differ in the case of their email; merge those first.
+
+Revision ID: 7f3a9c21b4d8
+Revises: cc9d438ed0f4
+Create Date: 2026-10-18 14:41:27.903215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3a9c21b4d8'
+down_revision: Union[str, Sequence[str], None] = 'cc9d438ed0f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_permission_name', 'permission', ['name'], unique=False)
+    op.create_index('ix_permission_roles', 'permission', ['roles'], unique=False, postgresql_using='gin')
+    op.create_index('ix_user_roles', 'user', ['roles'], unique=False, postgresql_using='gin')
+    op.create_index('ux_user_email_lower', 'user', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_user_email_lower', table_name='user')
+    op.drop_index('ix_user_roles', table_name='user')
+    op.drop_index('ix_permission_roles', table_name='permission')
+    op.drop_index('ix_permission_name', table_name='permission')
@@ -0,0 +1,30 @@
+"""keyset pagination indexes
+
+Revision ID: cc9d438ed0f4
+Revises: 54228f48da5a
+Create Date: 2026-10-18 10:12:04.518311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cc9d438ed0f4'
+down_revision: Union[str, Sequence[str], None] = '54228f48da5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_permission_created_id', 'permission', ['created', 'id'], unique=False)
+    op.create_index('ix_user_created_id', 'user', ['created', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_created_id', table_name='user')
+    op.drop_index('ix_permission_created_id', table_name='permission')
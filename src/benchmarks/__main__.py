@@ -0,0 +1,146 @@
+"""
+Benchmark suite, run against the configured Postgres (``DATABASE_URL``):
+
+    python -m src.benchmarks run --users 10000 --requests 500 --concurrency 10
+    python -m src.benchmarks compare .benchmarks/old.json .benchmarks/new.json
+
+``run`` seeds ``bench-*`` users, drives the endpoints in-process, runs the
+micro benchmarks and writes everything to one JSON file.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime, UTC
+from typing import Any
+
+from src.settings import settings
+
+
+SUITES = ("endpoints", "micro", "serialization")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    from src.benchmarks import endpoints, micro, serialization
+    from src.benchmarks.seed import cleanup, seed
+
+    results: dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "database_async": settings.database_async,
+            "users": args.users,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "repeat": args.repeat,
+        }
+    }
+
+    seeded = seed(args.users)
+    try:
+        if "endpoints" in args.suites:
+            results["endpoints"] = asyncio.run(
+                endpoints.run(seeded, args.requests, args.concurrency)
+            )
+        if "micro" in args.suites:
+            results["micro"] = micro.run(seeded, args.repeat)
+        if "serialization" in args.suites:
+            results["serialization"] = serialization.run(100, args.repeat)
+    finally:
+        if not args.keep:
+            cleanup()
+
+    return results
+
+
+def flatten(results: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if key in ("meta", "statuses"):
+            continue
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Print every p50/p99/throughput metric side by side with its change."""
+
+    with open(old_path) as f:
+        old = flatten(json.load(f))
+    with open(new_path) as f:
+        new = flatten(json.load(f))
+
+    for name in sorted(old.keys() & new.keys()):
+        if not name.endswith(("p50_ms", "p99_ms", "throughput_per_s", "speedup")):
+            continue
+        before, after = old[name], new[name]
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"{name:<55} {before:>12} {after:>12} {change:>9}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run or compare benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Seed, benchmark and save JSON results.")
+    run_parser.add_argument("--users", type=int, default=1000)
+    run_parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint.")
+    run_parser.add_argument("--concurrency", type=int, default=10)
+    run_parser.add_argument("--repeat", type=int, default=200, help="Calls per micro benchmark.")
+    run_parser.add_argument(
+        "--suites",
+        nargs="+",
+        choices=SUITES,
+        default=list(SUITES),
+    )
+    run_parser.add_argument("--output", help="Defaults to .benchmarks/<commit>-<time>.json")
+    run_parser.add_argument("--keep", action="store_true", help="Keep the seeded users.")
+
+    compare_parser = commands.add_parser("compare", help="Diff two result files.")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare(args.old, args.new)
+        return 0
+
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+
+    results = run(args)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(".benchmarks", f"{results['meta']['commit'] or 'local'}-{stamp}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+    print(f"Saved {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,133 @@
+import asyncio
+import itertools
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from src.benchmarks.seed import Seeded
+from src.benchmarks.stats import summarize
+from src.core.rate_limit import SlidingWindowLimit
+from src.main import app
+from src.modules.auth.routes import auth
+
+
+Call = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+async def load(
+    client: httpx.AsyncClient,
+    call: Call,
+    requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    """Issue ``requests`` calls from ``concurrency`` workers sharing one counter."""
+
+    remaining = itertools.count()
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async def worker() -> None:
+        while next(remaining) < requests:
+            start = time.perf_counter()
+            response = await call(client)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, statuses)
+
+
+async def login_token(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post(
+        "/v1/auth/login", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+@contextmanager
+def rate_limits_off():
+    """
+    Every request comes from the one ``ASGITransport`` address, so the auth
+    limits would answer most logins and signups with 429 and the numbers
+    would time the limiter instead of hashing.
+    """
+
+    names = ("login_ip_limit", "login_account_limit", "signup_ip_limit")
+    saved = {name: getattr(auth, name) for name in names}
+    for name, limit in saved.items():
+        setattr(auth, name, SlidingWindowLimit(limit.name, None))
+    try:
+        yield
+    finally:
+        for name, limit in saved.items():
+            setattr(auth, name, limit)
+
+
+async def run(seeded: Seeded, requests: int, concurrency: int) -> dict[str, Any]:
+    """
+    Drive the app in-process through ``httpx.ASGITransport``: no server or
+    socket overhead, but the real middleware, dependencies and database.
+    """
+
+    transport = httpx.ASGITransport(app=app)
+    with rate_limits_off():
+        return await _run(transport, seeded, requests, concurrency)
+
+
+async def _run(
+    transport: httpx.ASGITransport,
+    seeded: Seeded,
+    requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            admin = {"Authorization": f"Bearer {await login_token(client, seeded.admin_email, seeded.password)}"}
+            user = {"Authorization": f"Bearer {await login_token(client, seeded.user_email, seeded.password)}"}
+
+            signups = itertools.count()
+            cursor = ""
+
+            async def login(client):
+                return await client.post(
+                    "/v1/auth/login",
+                    data={"username": seeded.user_email, "password": seeded.password},
+                )
+
+            async def signup(client):
+                email = f"bench-signup-{next(signups)}-{time.time_ns()}@example.com"
+                return await client.post(
+                    "/v1/auth/signup", json={"email": email, "password": seeded.password}
+                )
+
+            async def me(client):
+                return await client.get("/v1/users/me/", headers=user)
+
+            async def users_paged(client):
+                # Walk the keyset pages, starting over after the last one
+                nonlocal cursor
+                response = await client.get(
+                    "/v1/users/", params={"cursor": cursor, "limit": 100}, headers=admin
+                )
+                cursor = response.headers.get("X-Next-Cursor", "")
+                return response
+
+            async def permission_denied(client):
+                return await client.get("/v1/users/", headers=user)
+
+            scenarios: dict[str, Call] = {
+                "login": login,
+                "signup": signup,
+                "me": me,
+                "users_paged": users_paged,
+                "permission_denied": permission_denied,
+            }
+            return {
+                name: await load(client, call, requests, concurrency)
+                for name, call in scenarios.items()
+            }
@@ -0,0 +1,133 @@
+import asyncio
+import io
+import os
+import tempfile
+from typing import Any
+
+from fastapi import UploadFile
+from sqlmodel import Session
+
+from src.benchmarks.seed import Seeded
+from src.benchmarks.stats import ameasure, measure
+from src.core.database import engine
+from src.core.files import S3File, StaticFile
+from src.core.hashing import hash_password, password_hasher
+from src.core.authentication import verify_password
+from src.modules.users.models.users import UserPublic
+from src.modules.users.selectors import UserSelector
+
+
+def selectors(seeded: Seeded, repeat: int) -> dict[str, Any]:
+    with Session(engine) as session:
+        first = UserSelector.all(session, 0, 1)[0]
+        deep_offset = max(seeded.users - 100, 0)
+        last_page = UserSelector.all_page(session, "", 100)
+
+        def get():
+            session.expunge_all()
+            UserSelector.get(first.id, session)
+
+        return {
+            "get": measure(get, repeat),
+            "all_offset_0": measure(lambda: UserSelector.all(session, 0, 100), repeat),
+            "all_offset_deep": measure(
+                lambda: UserSelector.all(session, deep_offset, 100), repeat
+            ),
+            "all_page": measure(
+                lambda: UserSelector.all_page(session, last_page.next_cursor, 100), repeat
+            ),
+            "all_rows": measure(
+                lambda: UserSelector.all_rows(session, UserPublic, 0, 100), repeat
+            ),
+        }
+
+
+def passwords(repeat: int) -> dict[str, Any]:
+    hashed = hash_password("bench-password-1")
+
+    async def pooled():
+        return await password_hasher.verify("bench-password-1", hashed)
+
+    async def pooled_parallel():
+        return await asyncio.gather(*(pooled() for _ in range(password_hasher.workers)))
+
+    return {
+        "verify_password": measure(lambda: verify_password("bench-password-1", hashed), repeat),
+        "pool_verify": asyncio.run(ameasure(pooled, repeat)),
+        # One call per pool worker at once, divide the latency by workers for
+        # the per-hash cost under load
+        "pool_verify_parallel": asyncio.run(ameasure(pooled_parallel, repeat)),
+    }
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename="bench.bin")
+
+
+def files(repeat: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    sizes = {"64KiB": 64 * 1024, "8MiB": 8 * 1024 * 1024}
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        original = StaticFile.base_dir, StaticFile.state_dir
+        StaticFile.base_dir = os.path.join(base_dir, "static")
+        StaticFile.state_dir = os.path.join(base_dir, "state")
+        try:
+            for label, size in sizes.items():
+                data = os.urandom(size)
+
+                async def static_roundtrip():
+                    url = await StaticFile(_upload(data)).save()
+                    await StaticFile(_upload(b"")).delete(url)
+
+                results[f"static_{label}"] = asyncio.run(ameasure(static_roundtrip, repeat))
+        finally:
+            StaticFile.base_dir, StaticFile.state_dir = original
+
+    results.update(_s3(sizes, repeat))
+    return results
+
+
+def _s3(sizes: dict[str, int], repeat: int) -> dict[str, Any]:
+    """S3File against moto's in-memory S3, when moto is installed."""
+
+    try:
+        import boto3
+        import moto
+    except ImportError:
+        return {"s3": "skipped, moto is not installed"}
+
+    results: dict[str, Any] = {}
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=S3File.bucket)
+        original = S3File.__dict__["s3"]
+        S3File.s3 = client
+        try:
+            for label, size in sizes.items():
+                data = os.urandom(size)
+
+                async def chunks():
+                    for start in range(0, len(data), 1024 * 1024):
+                        yield data[start:start + 1024 * 1024]
+
+                async def s3_roundtrip():
+                    url = await S3File.save_stream(chunks(), "application/octet-stream")
+                    await S3File(_upload(b"")).delete(url)
+
+                results[f"s3_{label}"] = asyncio.run(ameasure(s3_roundtrip, repeat))
+        finally:
+            S3File.s3 = original
+
+    return results
+
+
+def run(seeded: Seeded, repeat: int) -> dict[str, Any]:
+    try:
+        return {
+            "selectors": selectors(seeded, repeat),
+            "passwords": passwords(max(repeat // 10, 5)),
+            "files": files(max(repeat // 10, 5)),
+        }
+    finally:
+        password_hasher.shutdown()
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+
+from sqlmodel import Session, col, delete
+
+from src.core.database import create_db_and_tables, engine
+from src.core.hashing import hash_password
+from src.core.load_fixtures import load_fixtures
+from src.modules.users.enums import RoleEnum
+from src.modules.users.models.users import User
+from src.modules.users.selectors import UserSelector
+
+
+EMAIL_PREFIX = "bench-"
+PASSWORD = "bench-password-1"
+
+
+@dataclass
+class Seeded:
+    users: int
+    admin_email: str
+    user_email: str
+    password: str = PASSWORD
+
+
+def seed(users: int) -> Seeded:
+    """
+    Replace the benchmark users with ``users`` fresh ones plus one superadmin,
+    and load the permission fixtures. Every seeded user shares one password
+    hash, so seeding 100k users costs a single argon2 run.
+    """
+
+    create_db_and_tables()
+    load_fixtures()
+    cleanup()
+
+    hashed = hash_password(PASSWORD)
+    admin_email = f"{EMAIL_PREFIX}admin@example.com"
+    rows = [
+        {"email": admin_email, "password": hashed, "roles": [RoleEnum.superadmin.value]},
+        *(
+            {"email": f"{EMAIL_PREFIX}{i}@example.com", "password": hashed}
+            for i in range(users)
+        ),
+    ]
+
+    with Session(engine) as session:
+        for start in range(0, len(rows), 1000):
+            UserSelector.bulk_insert(UserSelector.bulk_rows(rows[start:start + 1000]), session)
+
+    return Seeded(
+        users=users,
+        admin_email=admin_email,
+        user_email=f"{EMAIL_PREFIX}0@example.com",
+    )
+
+
+def cleanup() -> int:
+    with Session(engine) as session:
+        result = session.execute(
+            delete(User).where(col(User.email).startswith(EMAIL_PREFIX))
+        )
+        session.commit()
+    return result.rowcount
@@ -0,0 +1,81 @@
+"""
+Compare the default ``response_model`` path with ``FastJSONResponse`` for a
+page of users, without a database:
+
+    python -m src.benchmarks.serialization --rows 100 --repeat 2000
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime, UTC
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src.core.responses import dump_json
+from src.modules.users.enums import RoleEnum
+from src.modules.users.models.users import User, UserPublic
+from src.modules.users.selectors import UserSelector
+
+
+def make_users(rows: int) -> list[User]:
+    now = datetime.now(UTC)
+    return [
+        User(
+            id=uuid4(),
+            email=f"user-{i}@example.com",
+            password="x" * 97,
+            roles=[RoleEnum.user.value],
+            created=now,
+            modified=now,
+        )
+        for i in range(rows)
+    ]
+
+
+def response_model_path(adapter: TypeAdapter, users: list[User]) -> bytes:
+    # What FastAPI does for response_model=list[UserPublic]: validate from
+    # attributes, dump to JSON-able python, run jsonable_encoder, json.dumps
+    validated = adapter.validate_python(users, from_attributes=True)
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, separators=(",", ":")).encode()
+
+
+def fast_path(users: list[User]) -> bytes:
+    return dump_json(UserSelector.project(users, UserPublic))
+
+
+def run(rows: int, repeat: int) -> dict:
+    users = make_users(rows)
+    adapter = TypeAdapter(list[UserPublic])
+
+    assert json.loads(response_model_path(adapter, users)) == json.loads(fast_path(users))
+
+    baseline = min(timeit.repeat(
+        lambda: response_model_path(adapter, users), number=repeat, repeat=3
+    ))
+    fast = min(timeit.repeat(lambda: fast_path(users), number=repeat, repeat=3))
+
+    return {
+        "rows": rows,
+        "repeat": repeat,
+        "response_model_us": round(baseline / repeat * 1e6, 1),
+        "fast_json_us": round(fast / repeat * 1e6, 1),
+        "speedup": round(baseline / fast, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark list serialization.")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
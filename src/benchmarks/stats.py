@@ -0,0 +1,67 @@
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted ``values``."""
+
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(q / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def summarize(
+    latencies: list[float],
+    elapsed: float,
+    statuses: Counter | None = None,
+) -> dict[str, Any]:
+    """Throughput and latency percentiles (milliseconds) for one scenario."""
+
+    ordered = sorted(latencies)
+    result = {
+        "count": len(ordered),
+        "throughput_per_s": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+    if statuses is not None:
+        result["statuses"] = {str(code): count for code, count in sorted(statuses.items())}
+    return result
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 3) -> dict[str, Any]:
+    """Time ``repeat`` sequential calls of ``fn``."""
+
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call_start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_start)
+
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def ameasure(
+    fn: Callable[[], Awaitable[Any]],
+    repeat: int,
+    warmup: int = 3,
+) -> dict[str, Any]:
+    for _ in range(warmup):
+        await fn()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call_start = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - call_start)
+
+    return summarize(latencies, time.perf_counter() - start)
@@ -2,22 +2,31 @@ from uuid import UUID
 import jwt
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Callable
-from pwdlib import PasswordHash
 from pydantic import BaseModel
+from redis.exceptions import RedisError
+from sqlalchemy import func
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 
-from src.core.database import SessionDep, engine
+from src.core.cache import TTLCache
+from src.core.database import DBSessionDep, SessionDep
+from src.core.hashing import check_password, hash_password, password_hasher
+from src.core.permissions import permission_cache
+from src.core.redis import get_redis
+from src.core.replicas import replica_reads
 from src.modules.users.models.users import User
 from src.modules.users.enums import RoleEnum
-from src.settings import settings
+from src.settings import logger, settings
 
 
 SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+AUTH_EPOCH_KEY = "auth:epoch"
 
 
 class Token(BaseModel):
@@ -29,22 +38,68 @@ class TokenData(BaseModel):
     user_id: str | None = None
 
 
-password_hash = PasswordHash.recommended()
+class ClaimsUser(BaseModel):
+    """Authenticated user rebuilt from verified JWT claims, without a DB read."""
+
+    id: UUID
+    email: str | None = None
+    roles: list[RoleEnum] = []
+    disabled: bool = False
+
+
+# Authenticated user snapshots keyed by user id. ``UserSelector`` invalidates
+# entries on update/delete; other workers see changes once the TTL expires.
+user_cache = TTLCache(
+    maxsize=settings.user_cache_max_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
+
+# Per-user token version stamps, see ``current_auth_version``
+auth_version_cache = TTLCache(
+    maxsize=settings.user_cache_max_size,
+    ttl=settings.jwt_version_cache_seconds,
+)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="v1/auth/login")
 
 
+def user_snapshot(user: User) -> dict:
+    """
+    Detached copy of the user with roles already coerced to ``RoleEnum``.
+    The password hash is left out, logins read it from the database.
+    """
+
+    data = user.model_dump(exclude={"password"})
+    data["roles"] = [
+        role if isinstance(role, RoleEnum) else RoleEnum(role)
+        for role in user.roles or []
+    ]
+    return data
+
+
 def verify_password(plain_password, hashed_password):
-    return password_hash.verify(plain_password, hashed_password)
+    return check_password(plain_password, hashed_password)
 
 
 def get_password_hash(password):
-    return password_hash.hash(password)
+    return hash_password(password)
+
+
+async def averify_password(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def aget_password_hash(password):
+    return await password_hasher.hash(password)
+
+
+def user_by_email(email: str):
+    # Matches ux_user_email_lower, so logins ignore case and use the index
+    return select(User).where(func.lower(User.email) == email.lower())
 
 
 def authenticate_user(username: str, password: str, session: SessionDep):
-    user = session.exec(
-        select(User).where(User.email == username)
-    ).first()
+    user = session.exec(user_by_email(username)).first()
 
     if not user:
         return False
@@ -53,6 +108,27 @@ def authenticate_user(username: str, password: str, session: SessionDep):
     return user
 
 
+async def aauthenticate_user(
+    username: str,
+    password: str,
+    session: AsyncSession | Session,
+):
+    password_hasher.reject_if_saturated()
+
+    statement = user_by_email(username)
+    if isinstance(session, AsyncSession):
+        result = await session.exec(statement)
+        user = result.first()
+    else:
+        user = await run_in_threadpool(lambda: session.exec(statement).first())
+
+    if not user:
+        return False
+    if not await averify_password(password, user.password):
+        return False
+    return user
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     if expires_delta:
@@ -64,6 +140,66 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
+def auth_version_key(user_id: UUID) -> str:
+    return f"auth:user-version:{user_id}"
+
+
+def current_auth_version(user_id: UUID) -> str | None:
+    """
+    Version stamp embedded in claims tokens as ``ver``.
+
+    It combines a global epoch (bumped by filter-based bulk writes) with a
+    per-user counter (bumped when the user's roles or status change), both
+    kept in Redis. Returns None when Redis is unreachable so callers fall
+    back to loading the user.
+    """
+
+    version = auth_version_cache.get(user_id)
+    if version is not None:
+        return version
+
+    try:
+        epoch, user_version = get_redis().mget(AUTH_EPOCH_KEY, auth_version_key(user_id))
+    except RedisError:
+        logger.warning("Could not read the token version of user %s", user_id)
+        return None
+
+    version = f"{int(epoch or 0)}.{int(user_version or 0)}"
+    auth_version_cache.set(user_id, version)
+    return version
+
+
+def revoke_user_claims(user_id: UUID | None = None) -> None:
+    """Invalidate claims tokens of one user, or of every user when ``user_id`` is None."""
+
+    key = AUTH_EPOCH_KEY if user_id is None else auth_version_key(user_id)
+    try:
+        get_redis().incr(key)
+    except RedisError:
+        logger.warning("Could not bump %s, claims tokens stay valid until expiry", key)
+
+    if user_id is None:
+        auth_version_cache.clear()
+    else:
+        auth_version_cache.invalidate(user_id)
+
+
+def create_user_access_token(user: User, expires_delta: timedelta | None = None):
+    data = {"sub": str(user.id)}
+
+    if settings.jwt_embed_claims:
+        version = current_auth_version(user.id)
+        if version is not None:
+            data.update({
+                "email": user.email,
+                "roles": [RoleEnum(role).value for role in user.roles or []],
+                "disabled": user.disabled,
+                "ver": version,
+            })
+
+    return create_access_token(data, expires_delta)
+
+
 def has_role_permission(roles: tuple[str, ...], user: User) -> bool:
     if not roles or not user:
         return False
@@ -81,33 +217,42 @@ def has_specific_permission(request: Request, user: User) -> bool:
 
     The permission check compares the FastAPI route name (the endpoint
     function name, e.g. ``get_users``) against the permission names
-    assigned to any of the user's roles.
+    assigned to any of the user's roles, using the in-process
+    ``permission_cache`` so no query runs on the request path.
     """
 
     route = request.scope.get('route')
     if not route or not user:
         return False
 
-    has_perm = False
+    return permission_cache.has_permission(user.roles, route.name)
 
-    from src.modules.users.selectors import PermissionSelector
 
-    with Session(engine) as session:
-        for role in user.roles:
-            permissions = PermissionSelector.filter(
-                session=session, field="roles", value=role
-            )
-            print(permissions)
-            for j in permissions:
-                if route.name == j.name:
-                    has_perm = True
+async def load_user(user_id: UUID, session: AsyncSession | Session) -> User | None:
+    """
+    Return a detached user from ``user_cache``, loading it on a miss. Its
+    ``password`` is blank, see ``user_snapshot``.
+    """
+
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        with replica_reads(session):
+            if isinstance(session, AsyncSession):
+                user = await session.get(User, user_id)
+            else:
+                user = await run_in_threadpool(session.get, User, user_id)
+        if user is None:
+            return None
+
+        snapshot = user_snapshot(user)
+        user_cache.set(user_id, snapshot)
 
-    return has_perm
+    return User.model_validate({**snapshot, "password": ""})
 
 
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session: SessionDep,
+    session: DBSessionDep,
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -124,16 +269,24 @@ async def get_current_user(
     except jwt.InvalidTokenError:
         raise credentials_exception
 
-    user = session.get(User, UUID(token_data.user_id))
+    user_id = UUID(token_data.user_id)
+
+    if settings.jwt_embed_claims and "ver" in payload:
+        version = auth_version_cache.get(user_id)
+        if version is None:
+            version = await run_in_threadpool(current_auth_version, user_id)
+        if version == payload["ver"]:
+            return ClaimsUser(
+                id=user_id,
+                email=payload.get("email"),
+                roles=payload.get("roles", []),
+                disabled=payload.get("disabled", False),
+            )
+
+    user = await load_user(user_id, session)
     if user is None:
         raise credentials_exception
 
-    if user.roles:
-        user.roles = [
-            role if isinstance(role, RoleEnum) else RoleEnum(role)
-            for role in user.roles
-        ]
-
     return user
 
 
@@ -156,6 +309,7 @@ def require_role(*allowed_roles: str) -> Callable:
         if has_role_permission(allowed_roles, current_user):
             return current_user
 
+        await permission_cache.arefresh()
         if has_specific_permission(request, current_user):
             return current_user
 
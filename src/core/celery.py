@@ -2,5 +2,17 @@ from celery.app import Celery
 
 from src.settings import settings
 
-celery_app = Celery(__name__, broker=settings.redis_url, backend=settings.redis_url)
+celery_app = Celery(
+    __name__,
+    broker=settings.redis_url,
+    backend=settings.celery_result_backend or settings.redis_url,
+)
+celery_app.conf.update(
+    task_always_eager=settings.celery_task_always_eager,
+    task_eager_propagates=settings.celery_task_always_eager,
+    # Eager jobs are still visible to /v1/jobs/{id}
+    task_store_eager_result=True,
+    task_track_started=True,
+    result_extended=True,
+)
 celery_app.autodiscover_tasks(["src.tasks"])
@@ -1,11 +1,117 @@
-from typing import Annotated, Type
+import asyncio
+from typing import Annotated, Any, Callable, Type
 from fastapi import Depends
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session as ORMSession
 from sqlmodel import create_engine, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.settings import settings
+from src.core.pool import engine_options
+from src.core.replicas import ReplicaSet, RoutingSession
+from src.settings import logger, settings
 
 
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, **engine_options())
+
+
+def to_async_url(database_url: str) -> str:
+    url = make_url(database_url)
+    return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+def get_async_database_url() -> str:
+    return settings.async_database_url or to_async_url(settings.database_url)
+
+
+async_engine: AsyncEngine | None = None
+if settings.database_async:
+    async_engine = create_async_engine(
+        get_async_database_url(), **engine_options(async_driver=True)
+    )
+
+
+def replica_set(engines: list) -> ReplicaSet:
+    return ReplicaSet(
+        engines,
+        max_lag=settings.replica_max_lag_seconds,
+        check_interval=settings.replica_check_seconds,
+    )
+
+
+# Only the request sessions route to replicas; they are built for the
+# configured mode
+replica_engines = []
+if not settings.database_async:
+    replica_engines = [
+        create_engine(url, **engine_options()) for url in settings.database_replica_urls
+    ]
+replicas = replica_set(replica_engines)
+
+async_replica_engines: list[AsyncEngine] = []
+if settings.database_async:
+    async_replica_engines = [
+        create_async_engine(to_async_url(url), **engine_options(async_driver=True))
+        for url in settings.database_replica_urls
+    ]
+async_replicas = replica_set([replica.sync_engine for replica in async_replica_engines])
+
+
+def pool_stats() -> dict:
+    stats = {"primary": engine.pool.pool_stats()}
+    if async_engine is not None:
+        stats["async"] = async_engine.pool.pool_stats()
+    for i, replica in enumerate(replica_engines + async_replica_engines):
+        stats[f"replica-{i}"] = replica.pool.pool_stats()
+    return stats
+
+
+# ``session.info`` key of the hook calls deferred by ``call_blocking``
+DEFERRED_KEY = "deferred_calls"
+
+
+def call_blocking(session: ORMSession, fn: Callable[..., Any], *args) -> None:
+    """
+    Call a blocking ``fn(*args)`` from a hook of ``session``. During an
+    ``AsyncSession`` commit hooks run on the event loop thread, so there
+    ``fn`` goes to the default executor and ``acommit`` waits for it;
+    elsewhere it runs right away. Deferred failures are logged.
+    """
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        fn(*args)
+        return
+
+    future = loop.run_in_executor(None, fn, *args)
+    future.add_done_callback(_log_failure)
+    session.info.setdefault(DEFERRED_KEY, []).append(future)
+
+
+def _log_failure(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Deferred commit hook failed", exc_info=future.exception())
+
+
+async def acommit(session: AsyncSession) -> None:
+    """
+    Commit, then wait for the hook calls the commit deferred, so cache drops
+    and token revocations have landed before the caller answers.
+    """
+
+    await session.commit()
+    deferred = session.info.pop(DEFERRED_KEY, [])
+    if deferred:
+        await asyncio.gather(*deferred, return_exceptions=True)
+
+
+def request_session() -> Session:
+    """Sync session for a request, routing ``replica_reads`` when replicas exist."""
+
+    if replicas:
+        return RoutingSession(engine, replicas=replicas)
+    return Session(engine)
 
 
 def create_db_and_tables():
@@ -13,11 +119,44 @@ def create_db_and_tables():
 
 
 def get_session():
-    with Session(engine) as session:
+    with request_session() as session:
         yield session
 
 SessionDep = Annotated[Session, Depends(get_session)]
 
+
+async def get_async_session():
+    if async_engine is None:
+        raise RuntimeError("Async database mode is disabled, set DATABASE_ASYNC=true")
+
+    options = {}
+    if async_replicas:
+        options = {"sync_session_class": RoutingSession, "replicas": async_replicas}
+
+    async with AsyncSession(async_engine, expire_on_commit=False, **options) as session:
+        yield session
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+
+async def get_db_session():
+    """
+    Yield the session for the configured database mode.
+
+    Routes that go through the async ``Selector`` methods depend on this, so
+    the same route runs on the asyncpg engine when ``DATABASE_ASYNC`` is set
+    and on the sync engine (one threadpool hop per query) otherwise.
+    """
+
+    if settings.database_async:
+        async for session in get_async_session():
+            yield session
+    else:
+        with request_session() as session:
+            yield session
+
+DBSessionDep = Annotated[Session | AsyncSession, Depends(get_db_session)]
+
 def update_or_create(model: Type[SQLModel], item: dict):
     instance = model.model_validate(item)
 
@@ -4,8 +4,19 @@ from fastapi import Depends
 
 from src.modules.users.models.users import User
 from src.core.authentication import require_role
+from src.core.hashing import password_hasher
 
 
 CurrentUser = Annotated[User, Depends(require_role('user', 'admin', 'superadmin'))]
 CurrentAdminUser= Annotated[User, Depends(require_role('user', 'admin'))]
 CurrentSuperAdminUser= Annotated[User, Depends(require_role('superadmin'))]
+
+
+async def password_hash_admission():
+    """Hold a hashing slot for the request, or answer 503 before any work."""
+
+    password_hasher.admit()
+    try:
+        yield
+    finally:
+        password_hasher.release()
@@ -1,21 +1,116 @@
+import asyncio
+import fcntl
+import hashlib
 import os
 import mimetypes
 import uuid
-import boto3
-import shutil
-import magic
+import tempfile
+import threading
+import jwt
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urlparse
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Optional
 
 from fastapi import UploadFile, HTTPException
+from pydantic import BaseModel
 from fastapi.concurrency import run_in_threadpool
+from redis.exceptions import RedisError
 
-from src.settings import EnvironmentEnum, settings
+from src.core.redis import get_redis
+from src.settings import EnvironmentEnum, logger, settings
+
+
+def sniff_mime(head: bytes) -> Optional[str]:
+    # libmagic loads its database on import, only pay for it on first upload
+    import magic
+
+    return magic.from_buffer(head, mime=True) if head else None
+
+
+class UploadValidator:
+    """
+    Validates an upload in the same pass that stores it.
+
+    ``feed`` is called with every chunk as it arrives: the MIME type is
+    sniffed once the first ``sniff_size`` bytes are in, the running size is
+    checked against ``max_size`` and a sha256 is updated incrementally, so a
+    bad upload fails on its first chunks instead of after being spooled.
+    """
+
+    sniff_size: int = 2048
+
+    def __init__(
+        self,
+        allowed_mimes: Optional[list[str]],
+        max_size: Optional[int],
+        content_type: Optional[str] = None,
+    ):
+        self.allowed_mimes = allowed_mimes
+        self.max_size = max_size
+        self.content_type = content_type
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self._head = bytearray()
+        # A declared type on the allow list needs no sniffing, like ``validate``
+        self.mime_checked = not allowed_mimes or content_type in allowed_mimes
+
+    def feed(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.max_size and self.size > self.max_size:
+            raise HTTPException(413, "File too large")
+
+        if not self.mime_checked:
+            self._head.extend(chunk[:self.sniff_size - len(self._head)])
+            if len(self._head) >= self.sniff_size:
+                self._check_mime()
+
+        self.sha256.update(chunk)
+
+    def finish(self) -> None:
+        if not self.mime_checked:
+            self._check_mime()
+
+    def _check_mime(self) -> None:
+        self.mime_checked = True
+        sniffed = sniff_mime(bytes(self._head))
+        if sniffed not in self.allowed_mimes:
+            raise HTTPException(400, "Invalid image type")
+
+    def hexdigest(self) -> str:
+        return self.sha256.hexdigest()
+
+    async def wrap(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            self.feed(chunk)
+            yield chunk
+        self.finish()
+
+
+class PresignedUpload(BaseModel):
+    key: str
+    url: str
+    method: str
+    # Form fields for POST uploads, sent before the file field
+    fields: dict[str, str] = {}
+    # Headers the client must send with PUT uploads
+    headers: dict[str, str] = {}
+    expires_in: int
+
+
+class StoredFile(BaseModel):
+    key: str
+    url: str
+    size: int
+    content_type: Optional[str] = None
 
 
 class FileInterface(ABC):
     allowed_mimes: Optional[list[str]] = None
+    # Bytes, 0 or None disables the limit
+    max_size: Optional[int] = settings.max_upload_size
     base_url: str
 
     def __init__(
@@ -23,8 +118,16 @@ class FileInterface(ABC):
         file: UploadFile
     ):
         self.file = file
+        # sha256 of the stored content, set by ``save``
+        self.checksum: Optional[str] = None
+
+    @classmethod
+    def validator(cls, content_type: Optional[str] = None) -> UploadValidator:
+        return UploadValidator(cls.allowed_mimes, cls.max_size, content_type)
 
     def validate(self):
+        if self.max_size and self.file.size and self.file.size > self.max_size:
+            raise HTTPException(413, "File too large")
         if not self.allowed_mimes:
             return
         if self.file.content_type not in self.allowed_mimes:
@@ -33,7 +136,7 @@ class FileInterface(ABC):
                 head = self.file.file.read(2048)
             finally:
                 self.file.file.seek(pos)
-            sniffed = magic.from_buffer(head, mime=True) if head else None
+            sniffed = sniff_mime(head)
             if sniffed not in self.allowed_mimes:
                 raise HTTPException(400, "Invalid image type")
 
@@ -45,82 +148,625 @@ class FileInterface(ABC):
     async def delete(self, image_url: str):
         ...
 
+    @classmethod
+    @abstractmethod
+    async def save_stream(
+        cls,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+        validator: Optional[UploadValidator] = None,
+    ) -> str:
+        """
+        Store ``chunks`` (e.g. ``request.stream()``) as they arrive, returning
+        the URL. ``validator`` checks every chunk on the way, so a bad upload
+        fails on its first chunks instead of after being spooled like an
+        ``UploadFile``.
+        """
+
+    # Direct uploads: the client sends the bytes to the URL returned by
+    # ``presign_upload`` and then calls ``complete_upload`` with the key,
+    # which validates the stored object before handing out its URL.
+    # Presigned keys live under ``<owner>/``, the id of the user who asked
+    # for them, and only that user can complete or download them.
+
+    @classmethod
+    @abstractmethod
+    async def presign_upload(
+        cls, content_type: str, owner: str, filename: Optional[str] = None
+    ) -> PresignedUpload:
+        ...
+
+    @classmethod
+    @abstractmethod
+    async def complete_upload(cls, key: str, owner: str) -> StoredFile:
+        ...
+
+    @classmethod
+    @abstractmethod
+    async def presign_download(cls, key: str, owner: str) -> str:
+        ...
+
+    @classmethod
+    def check_content_type(cls, content_type: str) -> None:
+        if cls.allowed_mimes and content_type not in cls.allowed_mimes:
+            raise HTTPException(400, "Invalid image type")
+
+    @classmethod
+    def new_key(cls, content_type: str, owner: str, filename: Optional[str] = None) -> str:
+        ext = os.path.splitext(filename)[1] if filename else ""
+        return f"{owner}/{uuid.uuid4()}{ext or mimetypes.guess_extension(content_type) or ''}"
+
+    @staticmethod
+    def check_owner(key: str, owner: str) -> None:
+        if not key.startswith(f"{owner}/") or ".." in key:
+            raise HTTPException(403, "Not your upload")
+
 
 class StaticFile(FileInterface):
+    """
+    Stores uploads under ``base_dir``.
+
+    By default every upload gets its own ``<uuid><ext>`` file. With
+    ``STATIC_CONTENT_ADDRESSED`` the file is hashed while it is written and
+    stored once as ``ab/cd/<sha256><ext>``; a ``.refs`` sidecar counts the
+    uploads pointing at it so ``delete`` only removes the last reference.
+    Presigned uploads keep their ``<owner>/<uuid><ext>`` key, as a symlink
+    to the shared file in that mode.
+
+    Temp files and sidecars live under ``state_dir``, outside the served
+    ``base_dir``. It must be on the same filesystem, files are moved in with
+    a rename.
+    """
+
     base_dir: str = "static"
+    state_dir: str = ".static-state"
     base_url: str = "/static"
+    # Route that accepts ``presign_upload`` PUTs, see ``src/modules/files``
+    upload_url: str = "/v1/files/local"
+    content_addressed: bool = settings.static_content_addressed
+    chunk_size: int = 1024 * 1024
 
     async def save(self) -> str:
-        self.validate()
-
-        os.makedirs(self.base_dir, exist_ok=True)
-
         if not self.file.filename:
             raise HTTPException(400, "File does not have a filename")
         ext = os.path.splitext(self.file.filename)[1]
 
-        filename = f"{uuid.uuid4()}{ext}"
-        path = os.path.join(self.base_dir, filename)
+        validator = self.validator(self.file.content_type)
+        relative = await run_in_threadpool(self._write_file, ext, validator)
+        self.checksum = validator.hexdigest()
+
+        return f"{self.base_url}/{relative}"
+
+    def _write_file(self, ext: str, validator: UploadValidator) -> str:
+        """Validate and write to a temp file in one pass, then move it in place."""
 
-        def _write_file() -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir())
+        try:
             self.file.file.seek(0)
-            with open(path, "wb") as f:
-                shutil.copyfileobj(self.file.file, f)
+            with os.fdopen(fd, "wb") as f:
+                while chunk := self.file.file.read(self.chunk_size):
+                    validator.feed(chunk)
+                    f.write(chunk)
+            validator.finish()
+
+            return self._store_new(tmp_path, validator.hexdigest(), ext)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    async def save_stream(
+        cls,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+        validator: Optional[UploadValidator] = None,
+    ) -> str:
+        ext = mimetypes.guess_extension(content_type) or ""
+        validator = validator or cls.validator(content_type)
+
+        fd, tmp_path = tempfile.mkstemp(dir=cls._tmp_dir())
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in validator.wrap(chunks):
+                    await run_in_threadpool(f.write, chunk)
+            relative = await run_in_threadpool(cls._store_new, tmp_path, validator.hexdigest(), ext)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return f"{cls.base_url}/{relative}"
+
+    @classmethod
+    def _store_new(cls, tmp_path: str, hexdigest: str, ext: str) -> str:
+        """Move a validated temp file to a new ``<uuid><ext>`` or its content address."""
+
+        if cls.content_addressed:
+            return cls._store_tmp(tmp_path, hexdigest, ext)
 
-        await run_in_threadpool(_write_file)
+        filename = f"{uuid.uuid4()}{ext}"
+        os.makedirs(cls.base_dir, exist_ok=True)
+        os.replace(tmp_path, os.path.join(cls.base_dir, filename))
+        return filename
 
-        return f"{self.base_url}/{filename}"
+    @classmethod
+    def _store_tmp(cls, tmp_path: str, hexdigest: str, ext: str) -> str:
+        """Move a fully written temp file to its content address, or drop it if known."""
 
-    async def delete(self, image_url: str):
-        if not image_url:
-            raise HTTPException(400, "image_url not defined")
+        relative = os.path.join(hexdigest[:2], hexdigest[2:4], f"{hexdigest}{ext}")
+        path = os.path.join(cls.base_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
 
+        with cls._refs(path) as refs:
+            if refs.count and os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, path)
+                refs.count = 0
+            refs.count += 1
+
+        return relative.replace(os.sep, "/")
+
+    @classmethod
+    def _tmp_dir(cls) -> str:
+        tmp_dir = os.path.join(cls.state_dir, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        return tmp_dir
+
+    @classmethod
+    def _refs_path(cls, path: str) -> str:
+        """Sidecar of a file in ``base_dir``, moving one left next to it by older versions."""
+
+        relative = os.path.relpath(os.path.realpath(path), os.path.realpath(cls.base_dir))
+        refs_path = os.path.join(cls.state_dir, "refs", f"{relative}.refs")
+        if os.path.exists(f"{path}.refs") and not os.path.exists(refs_path):
+            os.makedirs(os.path.dirname(refs_path), exist_ok=True)
+            os.replace(f"{path}.refs", refs_path)
+        return refs_path
+
+    @classmethod
+    @contextmanager
+    def _refs(cls, path: str):
+        """Exclusive, cross-process access to the reference count of ``path``."""
+
+        refs_path = cls._refs_path(path)
+        os.makedirs(os.path.dirname(refs_path), exist_ok=True)
+        with open(refs_path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            refs = SimpleNamespace(count=int(f.read() or 0))
+
+            yield refs
+
+            f.seek(0)
+            f.truncate()
+            f.write(str(refs.count))
+
+    @classmethod
+    async def presign_upload(
+        cls, content_type: str, owner: str, filename: Optional[str] = None
+    ) -> PresignedUpload:
+        cls.check_content_type(content_type)
+
+        key = cls.new_key(content_type, owner, filename)
+        expires_in = settings.presigned_url_expire_seconds
+        token = jwt.encode(
+            {
+                "key": key,
+                "content_type": content_type,
+                "scope": "local-upload",
+                "jti": uuid.uuid4().hex,
+                "exp": datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+            },
+            settings.secret_key,
+            algorithm=settings.algorithm,
+        )
 
+        return PresignedUpload(
+            key=key,
+            url=f"{cls.upload_url}/{token}",
+            method="PUT",
+            headers={"Content-Type": content_type},
+            expires_in=expires_in,
+        )
+
+    @classmethod
+    async def receive_upload(cls, token: str, chunks: AsyncIterator[bytes]) -> str:
+        """
+        Store a body sent to a ``presign_upload`` URL, returning its key.
+        Each URL works once and never replaces a stored file.
+        """
+
+        try:
+            claims = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        except jwt.InvalidTokenError:
+            raise HTTPException(403, "Invalid or expired upload URL")
+        if claims.get("scope") != "local-upload" or "jti" not in claims:
+            raise HTTPException(403, "Invalid or expired upload URL")
+
+        key = claims["key"]
+        path = cls._resolve_path(key)
+        if not await run_in_threadpool(cls._claim_upload, claims["jti"], claims["exp"]):
+            raise HTTPException(403, "Upload URL already used")
+        validator = cls.validator(claims["content_type"])
+
+        fd, tmp_path = tempfile.mkstemp(dir=cls._tmp_dir())
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in validator.wrap(chunks):
+                    await run_in_threadpool(f.write, chunk)
+            await run_in_threadpool(cls._place_upload, tmp_path, path, validator.hexdigest())
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return key
+
+    @staticmethod
+    def _claim_upload(jti: str, exp: int) -> bool:
+        """Mark an upload URL used; False when it already was."""
+
+        try:
+            return bool(get_redis().set(f"upload:used:{jti}", 1, nx=True, exat=int(exp)))
+        except RedisError:
+            # ``_place_upload`` still refuses to replace a stored file
+            logger.warning("Could not record upload URL use, relying on exclusive creation")
+            return True
+
+    @classmethod
+    def _place_upload(cls, tmp_path: str, path: str, hexdigest: str) -> None:
+        """Put a written temp file at ``path``, failing if something is already there."""
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            if cls.content_addressed:
+                relative = cls._store_tmp(tmp_path, hexdigest, os.path.splitext(path)[1])
+                target = os.path.join(os.path.abspath(cls.base_dir), relative)
+                try:
+                    os.symlink(os.path.relpath(target, os.path.dirname(path)), path)
+                except FileExistsError:
+                    cls._release(target)
+                    raise
+            else:
+                os.link(tmp_path, path)
+        except FileExistsError:
+            raise HTTPException(403, "Upload URL already used")
+
+    @classmethod
+    async def complete_upload(cls, key: str, owner: str) -> StoredFile:
+        cls.check_owner(key, owner)
+        path = cls._resolve_path(key)
+        if not os.path.isfile(path):
+            raise HTTPException(404, "Upload not found")
+
+        size = os.path.getsize(path)
+        if cls.max_size and size > cls.max_size:
+            await run_in_threadpool(cls._release, path)
+            raise HTTPException(413, "File too large")
+
+        return StoredFile(
+            key=key,
+            url=f"{cls.base_url}/{key}",
+            size=size,
+            content_type=mimetypes.guess_type(path)[0],
+        )
+
+    @classmethod
+    async def presign_download(cls, key: str, owner: str) -> str:
+        cls.check_owner(key, owner)
+        cls._resolve_path(key)
+        return f"{cls.base_url}/{key}"
+
+    @classmethod
+    def _resolve_path(cls, image_url: str) -> str:
         parsed = urlparse(image_url) if "://" in image_url else None
         if parsed:
             relative = parsed.path
-        elif self.base_url and image_url.startswith(self.base_url):
-            relative = image_url[len(self.base_url):]
+        elif cls.base_url and image_url.startswith(cls.base_url):
+            relative = image_url[len(cls.base_url):]
         else:
             relative = image_url
 
         relative = relative.lstrip("/")
-        base_dir = os.path.abspath(self.base_dir)
+        base_dir = os.path.abspath(cls.base_dir)
         path = os.path.abspath(os.path.join(base_dir, relative))
 
         if os.path.commonpath([base_dir, path]) != base_dir:
             raise HTTPException(400, "Invalid image path")
 
-        if os.path.exists(path):
+        return path
+
+    @classmethod
+    def _release(cls, path: str) -> None:
+        if os.path.islink(path):
+            # A presigned key pointing at a content-addressed file
+            target = os.path.realpath(path)
             os.remove(path)
+            path = target
+
+        if not os.path.exists(cls._refs_path(path)):
+            if os.path.exists(path):
+                os.remove(path)
+            return
+
+        # The sidecar is kept at zero so a concurrent save never races its removal
+        with cls._refs(path) as refs:
+            refs.count = max(refs.count - 1, 0)
+            if refs.count == 0 and os.path.exists(path):
+                os.remove(path)
+
+    async def delete(self, image_url: str):
+        if not image_url:
+            raise HTTPException(400, "image_url not defined")
+
+        path = self._resolve_path(image_url)
+        await run_in_threadpool(self._release, path)
+
+
+class LazyClient:
+    """
+    Class attribute built by ``factory`` on first access and then shared,
+    one instance per process: a forked worker builds its own instead of
+    reusing the parent's connections.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self._client: Any = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __get__(self, instance, owner) -> Any:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._client = self.factory()
+                    self._pid = os.getpid()
+        return self._client
+
+
+def s3_client():
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        "s3",
+        region_name=settings.s3_conf.region,
+        config=Config(max_pool_connections=max(10, settings.s3_conf.part_concurrency)),
+    )
 
 
 class S3File(FileInterface):
     prefix: str = settings.s3_conf.prefix
     bucket: str = settings.s3_conf.bucket
     base_url: str = f"https://{settings.s3_conf.bucket}.s3.{settings.s3_conf.region}.amazonaws.com"
-    s3 = boto3.client("s3", region_name=settings.s3_conf.region)
+    part_size: int = settings.s3_conf.part_size
+    part_concurrency: int = settings.s3_conf.part_concurrency
+    s3 = LazyClient(s3_client)
 
     async def save(self) -> str:
-        self.validate()
-
         if not self.file.content_type:
             raise HTTPException(400, "File does not have a content_type")
-        ext = mimetypes.guess_extension(self.file.content_type) or ""
-        key = f"{self.prefix}/{uuid.uuid4()}{ext}"
 
-        await run_in_threadpool(
-            self.s3.upload_fileobj,
-            self.file.file,
-            self.bucket,
-            key,
-            ExtraArgs={
-                "ContentType": self.file.content_type,
-                "ACL": "public-read",
-            },
+        validator = self.validator(self.file.content_type)
+        await self.file.seek(0)
+        url = await self.save_stream(self._iter_file(), self.file.content_type, validator)
+        self.checksum = validator.hexdigest()
+
+        return url
+
+    async def _iter_file(self) -> AsyncIterator[bytes]:
+        while chunk := await self.file.read(self.part_size):
+            yield chunk
+
+    @classmethod
+    async def save_stream(
+        cls,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+        validator: Optional[UploadValidator] = None,
+    ) -> str:
+        """
+        Upload ``chunks`` (e.g. ``request.stream()``) without spooling them.
+
+        Chunks pass through ``validator`` (a fresh ``cls.validator`` by
+        default) on their way out, so a wrong type or an oversized body
+        fails early and aborts the upload.
+
+        Bodies that fit in one part go through a single ``put_object``;
+        larger ones become a multipart upload with up to
+        ``part_concurrency`` parts in flight, which also bounds memory to
+        that many parts. Any failure aborts the multipart upload.
+        """
+
+        ext = mimetypes.guess_extension(content_type) or ""
+        key = f"{cls.prefix}/{uuid.uuid4()}{ext}"
+
+        validator = validator or cls.validator(content_type)
+        parts = cls._iter_parts(validator.wrap(chunks))
+        first = await anext(parts, None)
+        second = await anext(parts, None) if first is not None else None
+
+        if second is None:
+            await run_in_threadpool(
+                cls.s3.put_object,
+                Bucket=cls.bucket,
+                Key=key,
+                Body=first or b"",
+                ContentType=content_type,
+                ACL="public-read",
+            )
+        else:
+            await cls._multipart_upload(key, content_type, first, second, parts)
+
+        return f"{cls.base_url}/{key}"
+
+    @classmethod
+    async def _iter_parts(cls, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        buffer = bytearray()
+        async for chunk in chunks:
+            buffer.extend(chunk)
+            while len(buffer) >= cls.part_size:
+                yield bytes(buffer[:cls.part_size])
+                del buffer[:cls.part_size]
+
+        if buffer:
+            yield bytes(buffer)
+
+    @classmethod
+    async def _multipart_upload(
+        cls,
+        key: str,
+        content_type: str,
+        first: bytes,
+        second: bytes,
+        rest: AsyncIterator[bytes],
+    ) -> None:
+        upload = await run_in_threadpool(
+            cls.s3.create_multipart_upload,
+            Bucket=cls.bucket,
+            Key=key,
+            ContentType=content_type,
+            ACL="public-read",
         )
+        upload_id = upload["UploadId"]
+        slots = asyncio.Semaphore(cls.part_concurrency)
+        tasks: list[asyncio.Task] = []
 
-        return f"{self.base_url}/{key}"
+        async def _upload_part(number: int, body: bytes) -> dict:
+            try:
+                response = await run_in_threadpool(
+                    cls.s3.upload_part,
+                    Bucket=cls.bucket,
+                    Key=key,
+                    PartNumber=number,
+                    UploadId=upload_id,
+                    Body=body,
+                )
+            finally:
+                slots.release()
+            return {"PartNumber": number, "ETag": response["ETag"]}
+
+        async def _all_parts() -> AsyncIterator[bytes]:
+            yield first
+            yield second
+            async for part in rest:
+                yield part
+
+        try:
+            number = 0
+            async for body in _all_parts():
+                await slots.acquire()
+                for task in tasks:
+                    if task.done() and task.exception():
+                        raise task.exception()
+
+                number += 1
+                tasks.append(asyncio.create_task(_upload_part(number, body)))
+
+            uploaded = await asyncio.gather(*tasks)
+            await run_in_threadpool(
+                cls.s3.complete_multipart_upload,
+                Bucket=cls.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": uploaded},
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await run_in_threadpool(
+                cls.s3.abort_multipart_upload,
+                Bucket=cls.bucket,
+                Key=key,
+                UploadId=upload_id,
+            )
+            raise
+
+    @classmethod
+    def check_key(cls, key: str, owner: str) -> None:
+        if not key.startswith(f"{cls.prefix}/"):
+            raise HTTPException(400, "Invalid image path")
+        cls.check_owner(key[len(cls.prefix) + 1:], owner)
+
+    @classmethod
+    async def presign_upload(
+        cls, content_type: str, owner: str, filename: Optional[str] = None
+    ) -> PresignedUpload:
+        cls.check_content_type(content_type)
+
+        key = f"{cls.prefix}/{cls.new_key(content_type, owner, filename)}"
+        expires_in = settings.presigned_url_expire_seconds
+        conditions: list = [
+            {"Content-Type": content_type},
+            {"acl": "public-read"},
+        ]
+        if cls.max_size:
+            conditions.append(["content-length-range", 1, cls.max_size])
+
+        presigned = await run_in_threadpool(
+            cls.s3.generate_presigned_post,
+            Bucket=cls.bucket,
+            Key=key,
+            Fields={"Content-Type": content_type, "acl": "public-read"},
+            Conditions=conditions,
+            ExpiresIn=expires_in,
+        )
+
+        return PresignedUpload(
+            key=key,
+            url=presigned["url"],
+            method="POST",
+            fields=presigned["fields"],
+            expires_in=expires_in,
+        )
+
+    @classmethod
+    async def complete_upload(cls, key: str, owner: str) -> StoredFile:
+        from botocore.exceptions import ClientError
+
+        cls.check_key(key, owner)
+
+        try:
+            head = await run_in_threadpool(cls.s3.head_object, Bucket=cls.bucket, Key=key)
+        except ClientError:
+            raise HTTPException(404, "Upload not found")
+
+        try:
+            validator = cls.validator(head.get("ContentType"))
+            if cls.max_size and head["ContentLength"] > cls.max_size:
+                raise HTTPException(413, "File too large")
+
+            if not validator.mime_checked:
+                sample = await run_in_threadpool(
+                    cls.s3.get_object,
+                    Bucket=cls.bucket,
+                    Key=key,
+                    Range=f"bytes=0-{validator.sniff_size - 1}",
+                )
+                validator.feed(sample["Body"].read())
+                validator.finish()
+        except HTTPException:
+            await run_in_threadpool(cls.s3.delete_object, Bucket=cls.bucket, Key=key)
+            raise
+
+        return StoredFile(
+            key=key,
+            url=f"{cls.base_url}/{key}",
+            size=head["ContentLength"],
+            content_type=head.get("ContentType"),
+        )
+
+    @classmethod
+    async def presign_download(cls, key: str, owner: str) -> str:
+        cls.check_key(key, owner)
+
+        return await run_in_threadpool(
+            cls.s3.generate_presigned_url,
+            "get_object",
+            Params={"Bucket": cls.bucket, "Key": key},
+            ExpiresIn=settings.presigned_url_expire_seconds,
+        )
 
     async def delete(self, image_url: str):
         parsed = urlparse(image_url) if "://" in image_url else None
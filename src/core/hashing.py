@@ -0,0 +1,151 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+from pwdlib import PasswordHash
+
+from src.settings import HashExecutorEnum, settings
+
+
+password_hash = PasswordHash.recommended()
+
+
+def hash_password(password: str) -> str:
+    return password_hash.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return password_hash.verify(plain_password, hashed_password)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return [password_hash.hash(password) for password in passwords]
+
+
+class PasswordHasher:
+    """
+    Runs argon2 hashing off the event loop on a dedicated executor.
+
+    At most ``workers`` hashes run at once per app worker and at most
+    ``queue_size`` more wait for a slot. Anything beyond that is rejected
+    straight away with 503 so a login burst cannot pile up behind the pool.
+
+    ``admit``/``release`` apply the same budget to whole requests: auth
+    routes take a slot before any lookup or hashing starts, so a burst is
+    turned away before it costs a database query.
+    """
+
+    def __init__(self, executor: HashExecutorEnum, workers: int, queue_size: int):
+        self.executor_type = executor
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._admitted = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == HashExecutorEnum.process:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hash",
+                )
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def saturated(self) -> bool:
+        return self._pending >= self.workers + self.queue_size
+
+    @property
+    def admitted(self) -> int:
+        return self._admitted
+
+    def busy(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent password operations, retry later",
+            headers={"Retry-After": "1"},
+        )
+
+    def reject_if_saturated(self) -> None:
+        if self.saturated:
+            raise self.busy()
+
+    def admit(self) -> None:
+        if self._admitted >= self.workers + self.queue_size:
+            raise self.busy()
+        self._admitted += 1
+
+    def release(self) -> None:
+        self._admitted -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self.reject_if_saturated()
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(check_password, plain_password, hashed_password)
+
+    def split(self, values: list[str]) -> list[list[str]]:
+        """Slice ``values`` into at most ``workers`` contiguous chunks."""
+
+        size = -(-len(values) // self.workers) if values else 1
+        return [values[i:i + size] for i in range(0, len(values), size)]
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """Hash a batch with one executor task per pool worker."""
+
+        self.reject_if_saturated()
+
+        chunks = self.split(passwords)
+        loop = asyncio.get_running_loop()
+        self._pending += len(chunks)
+        try:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(self.executor, hash_passwords, chunk)
+                for chunk in chunks
+            ))
+        finally:
+            self._pending -= len(chunks)
+
+        return [hashed for chunk in results for hashed in chunk]
+
+    def hash_many_sync(self, passwords: list[str]) -> list[str]:
+        results = self.executor.map(hash_passwords, self.split(passwords))
+        return [hashed for chunk in results for hashed in chunk]
+
+    def warm_up(self) -> None:
+        """Start every executor worker now rather than on the first logins."""
+
+        futures = [self.executor.submit(hash_password, "warm-up") for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=settings.password_hash_conf.executor,
+    workers=settings.password_hash_conf.workers,
+    queue_size=settings.password_hash_conf.queue_size,
+)
@@ -0,0 +1,206 @@
+import hashlib
+import json
+from functools import cache
+from typing import Any
+from uuid import uuid4
+
+from fastapi import Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+
+from src.core.redis import get_redis
+from src.settings import logger
+
+
+@cache
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def render_json(response_type: Any, value: Any) -> bytes:
+    """Serialize ``value`` the way ``response_model=response_type`` would."""
+
+    adapter = _adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def make_etag(body: bytes) -> str:
+    """Strong validator: the same bytes always get the same tag."""
+
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in tags
+
+
+def not_modified(
+    request: Request,
+    etag: str | None,
+    cache_control: str,
+    headers: dict[str, str] | None = None,
+) -> Response | None:
+    """
+    The empty 304 for a GET or HEAD whose ``If-None-Match`` holds ``etag``,
+    None when the full response is needed (or ``etag`` is unknown).
+    """
+
+    if etag is None or request.method not in ("GET", "HEAD") or not etag_matches(request, etag):
+        return None
+
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": cache_control}
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    cache_control: str,
+    headers: dict[str, str] | None = None,
+    etag: str | None = None,
+) -> Response:
+    """
+    Answer with ``body`` and its ETag (a hash of ``body`` unless given), or
+    with an empty 304 when the client already holds that representation.
+    Only GET and HEAD revalidate; other methods always get the full body.
+    """
+
+    etag = etag or make_etag(body)
+    response = not_modified(request, etag, cache_control, headers)
+    if response is not None:
+        return response
+
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": cache_control}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class EntityTags:
+    """
+    ETags of single rows that cost one Redis read instead of loading and
+    rendering the row, so a matching conditional GET skips the database.
+
+    A row's tag joins two random tokens kept in Redis: one for the namespace
+    and one for the row. ``invalidate(id)`` drops the row's token and
+    ``invalidate()`` the namespace's; the next read stores fresh ones, so a
+    dropped (or expired, or flushed) token never validates again. Call
+    ``invalidate`` after every committed write that changes the
+    representation. Redis errors return None, callers then hash the body.
+    """
+
+    def __init__(self, namespace: str, ttl: int = 24 * 3600):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _keys(self, id: Any) -> tuple[str, str]:
+        return f"{self.namespace}:tag", f"{self.namespace}:tag:{id}"
+
+    def etag(self, id: Any) -> str | None:
+        keys = self._keys(id)
+        try:
+            redis = get_redis()
+            tokens = redis.mget(keys)
+            if None in tokens:
+                pipe = redis.pipeline()
+                for key, token in zip(keys, tokens):
+                    if token is None:
+                        pipe.set(key, uuid4().hex, nx=True, ex=self.ttl)
+                pipe.mget(keys)
+                tokens = pipe.execute()[-1]
+        except RedisError:
+            logger.warning("Could not read %s tags from Redis", self.namespace)
+            return None
+
+        return f'"{"-".join(token.decode() for token in tokens)}"'
+
+    def invalidate(self, id: Any = None) -> None:
+        key = self._keys(id)[0 if id is None else 1]
+        try:
+            get_redis().delete(key)
+        except RedisError:
+            logger.warning("Could not drop %s, its ETag stays valid until it expires", key)
+
+    async def aetag(self, id: Any) -> str | None:
+        return await run_in_threadpool(self.etag, id)
+
+
+class ResponseCache:
+    """
+    Rendered responses shared by every worker through Redis.
+
+    Entries live under ``<namespace>:<version>:<key>`` for ``ttl`` seconds.
+    ``invalidate`` bumps the namespace version, which orphans every entry at
+    once; the orphans expire on their own. A ``ttl`` of zero disables the
+    cache, and Redis errors count as misses.
+    """
+
+    def __init__(self, namespace: str, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def version_key(self) -> str:
+        return f"{self.namespace}:version"
+
+    def _entry_key(self, key: str) -> str:
+        version = get_redis().get(self.version_key)
+        return f"{self.namespace}:{int(version or 0)}:{key}"
+
+    def get(self, key: str) -> tuple[bytes, dict[str, str]] | None:
+        if not self.enabled:
+            return None
+
+        try:
+            raw = get_redis().get(self._entry_key(key))
+        except RedisError:
+            logger.warning("Could not read %s from Redis", self.namespace)
+            return None
+
+        if raw is None:
+            return None
+
+        entry = json.loads(raw)
+        return entry["body"].encode(), entry["headers"]
+
+    def set(self, key: str, body: bytes, headers: dict[str, str] | None = None) -> None:
+        if not self.enabled:
+            return
+
+        entry = json.dumps({"body": body.decode(), "headers": headers or {}})
+        try:
+            get_redis().set(self._entry_key(key), entry, ex=self.ttl)
+        except RedisError:
+            logger.warning("Could not write %s to Redis", self.namespace)
+
+    def invalidate(self) -> None:
+        if not self.enabled:
+            return
+
+        try:
+            get_redis().incr(self.version_key)
+        except RedisError:
+            logger.warning(
+                "Could not bump %s, cached responses live until their TTL",
+                self.version_key,
+            )
+
+    async def aget(self, key: str) -> tuple[bytes, dict[str, str]] | None:
+        if not self.enabled:
+            return None
+        return await run_in_threadpool(self.get, key)
+
+    async def aset(self, key: str, body: bytes, headers: dict[str, str] | None = None) -> None:
+        if self.enabled:
+            await run_in_threadpool(self.set, key, body, headers)
@@ -0,0 +1,139 @@
+from datetime import timedelta
+from typing import Any, Callable, Optional, Sequence
+from uuid import uuid4
+
+from celery import Task
+from celery.result import AsyncResult
+from fastapi import status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from src.core.celery import celery_app
+from src.core.redis import get_redis
+from src.settings import logger
+
+
+class JobStatus(BaseModel):
+    id: str
+    state: str
+    done: int | None = None
+    total: int | None = None
+    result: Any = None
+    error: str | None = None
+
+
+def chunked_task(chunk_size: int = 100, **task_options) -> Callable[[Callable], Task]:
+    """
+    Register ``fn(ids, **kwargs)`` as a Celery task that maps over ``ids``.
+
+    The task calls ``fn`` once per batch of ``chunk_size`` ids and reports
+    ``{"done", "total"}`` progress after each batch, which ``/v1/jobs/{id}``
+    serves. Non-None batch results are collected into the final result.
+    """
+
+    def decorator(fn: Callable) -> Task:
+        @celery_app.task(bind=True, name=f"{fn.__module__}.{fn.__name__}", **task_options)
+        def run(self: Task, ids: Sequence, **kwargs):
+            total = len(ids)
+            results = []
+
+            self.update_state(state="PROGRESS", meta={"done": 0, "total": total})
+            for start in range(0, total, chunk_size):
+                result = fn(ids[start:start + chunk_size], **kwargs)
+                if result is not None:
+                    results.append(result)
+
+                done = min(start + chunk_size, total)
+                self.update_state(state="PROGRESS", meta={"done": done, "total": total})
+
+            return {"done": total, "total": total, "results": results}
+
+        run.__doc__ = fn.__doc__
+        return run
+
+    return decorator
+
+
+def _owner_key(job_id: str) -> str:
+    return f"job:owner:{job_id}"
+
+
+def _submit(task: Task, args: Sequence, kwargs: dict, owner: str) -> str:
+    """
+    Record ``owner`` for a new job id, then publish ``task`` under it.
+
+    The owner is kept in Redis as long as Celery keeps the result. Both
+    calls block, run this in the threadpool.
+    """
+
+    job_id = str(uuid4())
+    expires = celery_app.conf.result_expires
+    try:
+        get_redis().set(
+            _owner_key(job_id),
+            owner,
+            ex=expires if not isinstance(expires, timedelta) else int(expires.total_seconds()),
+        )
+    except RedisError:
+        logger.warning("Could not record the owner of job %s, only superadmins will see it", job_id)
+
+    task.apply_async(args=jsonable_encoder(args), kwargs=jsonable_encoder(kwargs), task_id=job_id)
+    return job_id
+
+
+async def enqueue(task: Task, *args, owner: str, **kwargs) -> JSONResponse:
+    """
+    Queue ``task`` on behalf of ``owner`` (a user id) and answer 202 with
+    where to poll for its progress.
+    """
+
+    job_id = await run_in_threadpool(_submit, task, args, kwargs, owner)
+    status_url = f"/v1/jobs/{job_id}"
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"job_id": job_id, "status_url": status_url},
+        headers={"Location": status_url},
+    )
+
+
+def job_owner(job_id: str) -> Optional[str]:
+    """User id that queued ``job_id``, None when unknown or Redis is down."""
+
+    try:
+        owner = get_redis().get(_owner_key(job_id))
+    except RedisError:
+        logger.warning("Could not read the owner of job %s", job_id)
+        return None
+    return owner.decode() if owner is not None else None
+
+
+def job_status(job_id: str) -> JobStatus:
+    result = AsyncResult(job_id, app=celery_app)
+    job = JobStatus(id=job_id, state=result.state)
+    info = result.info
+
+    if result.failed():
+        # The repr may hold SQL, parameters or paths, callers only get the type
+        logger.error("Job %s failed: %r", job_id, info)
+        job.error = type(info).__name__ if isinstance(info, BaseException) else "Job failed"
+    elif isinstance(info, dict):
+        job.done = info.get("done")
+        job.total = info.get("total")
+        if result.successful():
+            job.result = info.get("results", info)
+    elif result.successful():
+        job.result = info
+
+    return job
+
+
+async def ajob_status(job_id: str) -> JobStatus:
+    return await run_in_threadpool(job_status, job_id)
+
+
+async def ajob_owner(job_id: str) -> Optional[str]:
+    return await run_in_threadpool(job_owner, job_id)
@@ -1,26 +1,33 @@
+import asyncio
 from abc import ABC
-from fastapi_mail import (
-    ConnectionConfig,
-    FastMail,
-    MessageSchema,
-    MessageType,
-    NameEmail
-)
-
-from src.settings import EnvironmentEnum, settings
-
-
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.mail_conf.username,
-    MAIL_PASSWORD=settings.mail_conf.password,
-    MAIL_FROM=settings.mail_conf.mail_from,
-    MAIL_PORT=settings.mail_conf.port,
-    MAIL_SERVER=settings.mail_conf.server,
-    MAIL_STARTTLS=settings.mail_conf.starttls,
-    MAIL_SSL_TLS=settings.mail_conf.ssl_tls,
-    USE_CREDENTIALS=settings.mail_conf.use_credentials,
-    VALIDATE_CERTS=settings.mail_conf.validate_certs,
-)
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from functools import cache
+
+import aiosmtplib
+from fastapi.concurrency import run_in_threadpool
+from pydantic import NameEmail
+
+from src.settings import EnvironmentEnum, MailBackendEnum, MailConfig, logger, settings
+
+
+@cache
+def connection_config():
+    """fastapi-mail config, built the first time ``SMTPEmail`` sends."""
+
+    from fastapi_mail import ConnectionConfig
+
+    return ConnectionConfig(
+        MAIL_USERNAME=settings.mail_conf.username,
+        MAIL_PASSWORD=settings.mail_conf.password,
+        MAIL_FROM=settings.mail_conf.mail_from,
+        MAIL_PORT=settings.mail_conf.port,
+        MAIL_SERVER=settings.mail_conf.server,
+        MAIL_STARTTLS=settings.mail_conf.starttls,
+        MAIL_SSL_TLS=settings.mail_conf.ssl_tls,
+        USE_CREDENTIALS=settings.mail_conf.use_credentials,
+        VALIDATE_CERTS=settings.mail_conf.validate_certs,
+    )
 
 
 class EmailInterface(ABC):
@@ -32,16 +39,185 @@ class EmailInterface(ABC):
 class SMTPEmail(EmailInterface):
     @staticmethod
     async def send(subject: str, recipients: list[NameEmail], body: str):
+        from fastapi_mail import FastMail, MessageSchema, MessageType
+
         message = MessageSchema(
             subject=subject,
             recipients=recipients,
             body=body,
             subtype=MessageType.html)
 
-        fm = FastMail(conf)
+        fm = FastMail(connection_config())
         await fm.send_message(message)
 
 
+class SMTPConnectionPool:
+    """
+    Keeps up to ``pool_size`` connected and authenticated SMTP clients.
+
+    Connections belong to the event loop that opened them, so the pool
+    starts over when it is used from a different loop.
+    """
+
+    def __init__(self, mail_conf: MailConfig):
+        self.mail_conf = mail_conf
+        self._idle: list[aiosmtplib.SMTP] = []
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._idle = []
+            self._slots = asyncio.Semaphore(self.mail_conf.pool_size)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.mail_conf.server,
+            port=self.mail_conf.port,
+            use_tls=self.mail_conf.ssl_tls,
+            start_tls=self.mail_conf.starttls,
+            validate_certs=self.mail_conf.validate_certs,
+            timeout=self.mail_conf.timeout,
+        )
+        await smtp.connect()
+        if self.mail_conf.use_credentials:
+            await smtp.login(
+                self.mail_conf.username,
+                self.mail_conf.password.get_secret_value(),
+            )
+        return smtp
+
+    @asynccontextmanager
+    async def connection(self):
+        self._bind_loop()
+
+        async with self._slots:
+            smtp = self._idle.pop() if self._idle else None
+            try:
+                if smtp is None or not smtp.is_connected:
+                    smtp = await self._connect()
+                yield smtp
+            except BaseException:
+                if smtp is not None:
+                    smtp.close()
+                    smtp = None
+                raise
+            finally:
+                if smtp is not None:
+                    self._idle.append(smtp)
+
+    async def send_messages(self, messages: list[EmailMessage], skip_rejected: bool = False) -> None:
+        """
+        Send ``messages`` over one pooled connection, reconnecting once if it
+        went stale. Sent messages are removed from the list, so on failure
+        it holds exactly what is left to retry.
+
+        With ``skip_rejected`` a message the server permanently rejects (see
+        ``is_rejected``) is logged and dropped, and the rest still go out.
+        """
+
+        for attempt in range(2):
+            try:
+                async with self.connection() as smtp:
+                    while messages:
+                        try:
+                            await smtp.send_message(messages[0])
+                        except (aiosmtplib.SMTPException, ValueError) as exc:
+                            if not (skip_rejected and is_rejected(exc)):
+                                raise
+                            logger.error("Dropping mail to %s: %s", messages[0]["To"], exc)
+                        messages.pop(0)
+                return
+            except aiosmtplib.SMTPServerDisconnected:
+                if attempt:
+                    raise
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for smtp in idle:
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
+
+def is_rejected(exc: Exception) -> bool:
+    """
+    Whether sending one message failed for good: a 5xx reply to it, every
+    recipient refused with 5xx, or an address that cannot be sent to.
+    Connection errors and 4xx replies are worth retrying.
+    """
+
+    if isinstance(exc, ValueError):
+        return True
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        return all(error.code >= 500 for error in exc.recipients)
+    return (
+        isinstance(exc, (aiosmtplib.SMTPSenderRefused, aiosmtplib.SMTPRecipientRefused, aiosmtplib.SMTPDataError))
+        and exc.code >= 500
+    )
+
+
+smtp_pool = SMTPConnectionPool(settings.mail_conf)
+
+
+def build_message(subject: str, recipients: list[str], body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = settings.mail_conf.mail_from
+    message["To"] = ", ".join(recipients)
+    message.set_content(body, subtype="html")
+    return message
+
+
+def recipient_list(recipients: list[NameEmail | str]) -> list[str]:
+    return [str(recipient) for recipient in recipients]
+
+
+class PooledSMTPEmail(EmailInterface):
+    @staticmethod
+    async def send(subject: str, recipients: list[NameEmail], body: str):
+        message = build_message(subject, recipient_list(recipients), body)
+        await smtp_pool.send_messages([message])
+
+    @staticmethod
+    async def send_many(messages: list[tuple[str, list[NameEmail], str]]):
+        """Send ``(subject, recipients, body)`` tuples in ``MAIL_BATCH_SIZE`` batches."""
+
+        built = [
+            build_message(subject, recipient_list(recipients), body)
+            for subject, recipients, body in messages
+        ]
+        batch_size = settings.mail_conf.batch_size
+        await asyncio.gather(*(
+            smtp_pool.send_messages(built[i:i + batch_size])
+            for i in range(0, len(built), batch_size)
+        ))
+
+
+class QueuedEmail(EmailInterface):
+    """Hands messages to the Celery ``send_emails`` task and returns immediately."""
+
+    @staticmethod
+    async def send(subject: str, recipients: list[NameEmail], body: str):
+        await QueuedEmail.send_many([(subject, recipients, body)])
+
+    @staticmethod
+    async def send_many(messages: list[tuple[str, list[NameEmail], str]]):
+        from src.tasks.tasks import send_emails
+
+        payload = [
+            [subject, recipient_list(recipients), body]
+            for subject, recipients, body in messages
+        ]
+        batch_size = settings.mail_conf.batch_size
+        for i in range(0, len(payload), batch_size):
+            # Publishing is a blocking broker round trip
+            await run_in_threadpool(send_emails.delay, payload[i:i + batch_size])
+
+
 class ConsoleEmail(EmailInterface):
     @staticmethod
     async def send(subject: str, recipients: list[NameEmail], body: str):
@@ -61,10 +237,13 @@ class ConsoleEmail(EmailInterface):
 
 def get_email_sender() -> type[EmailInterface]:
     if settings.environment == EnvironmentEnum.prod:
-        return SMTPEmail
+        return {
+            MailBackendEnum.smtp: SMTPEmail,
+            MailBackendEnum.pooled: PooledSMTPEmail,
+            MailBackendEnum.queued: QueuedEmail,
+        }[settings.mail_conf.backend]
 
     return ConsoleEmail
 
 
 email_manager = get_email_sender()
-
@@ -0,0 +1,180 @@
+import hmac
+import os
+import time
+
+from anyio import to_thread
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.database import pool_stats
+from src.core.hashing import password_hasher
+from src.core.profiler import profile_queries
+from src.settings import EnvironmentEnum, settings
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request",
+    ["method", "route"],
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL statements executed, inside or outside requests",
+)
+THREADPOOL_BUSY = Gauge(
+    "threadpool_busy_threads",
+    "Threads of the default AnyIO pool running sync code",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_WAITING = Gauge(
+    "threadpool_waiting_tasks",
+    "Calls queued for a free thread in the default AnyIO pool",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_PENDING = Gauge(
+    "password_hash_pending",
+    "Password hashes running or queued on the hashing pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    DB_QUERIES.inc()
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Template of the matched route, e.g. ``/v1/users/{id}``, so ids do not
+    explode the series count.
+
+    ``route.path_format`` is relative to the router or mount that matched
+    it (``/users/{id}`` on recent FastAPI), so the prefix is taken from the
+    request path: whatever precedes the part the route's pattern matched.
+    """
+
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+
+    path = scope["path"]
+    for i, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[i:]):
+            return path[:i] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Records latency, status, in-flight count and DB usage for each request."""
+
+    def __init__(self, app: ASGIApp, exclude: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        with profile_queries() as profile:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - start
+                in_progress.dec()
+
+                route = route_template(scope)
+                REQUEST_LATENCY.labels(method, route, str(status_code)).observe(elapsed)
+                REQUEST_DB_QUERIES.labels(method, route).observe(profile.queries)
+                REQUEST_DB_SECONDS.labels(method, route).observe(profile.seconds)
+
+
+def collect_gauges() -> None:
+    """Refresh the point-in-time gauges right before a scrape."""
+
+    limiter = to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    THREADPOOL_BUSY.set(statistics.borrowed_tokens)
+    THREADPOOL_WAITING.set(statistics.tasks_waiting)
+    PASSWORD_HASH_PENDING.set(password_hasher.pending)
+
+    for name, stats in pool_stats().items():
+        DB_POOL_CHECKED_OUT.labels(name).set(stats["checked_out"])
+
+
+def metrics_authorized(request: Request) -> bool:
+    """
+    ``Authorization: Bearer <METRICS_TOKEN>``. Without a token only non-prod
+    environments serve metrics, like ``/v1/internal/pool`` they expose pool
+    and hashing load.
+    """
+
+    token = settings.metrics_token.get_secret_value() if settings.metrics_token else ""
+    if not token:
+        return settings.environment != EnvironmentEnum.prod
+
+    scheme, _, given = request.headers.get("authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(given.encode(), token.encode())
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    if not metrics_authorized(request):
+        return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+
+    collect_gauges()
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Several app workers: merge the per-process files
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import defaultdict
+from enum import Enum
+from typing import Iterable
+
+from fastapi.concurrency import run_in_threadpool
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session, select
+
+from src.core.database import call_blocking, engine
+from src.core.redis import get_redis
+from src.modules.users.models.users import Permission
+from src.settings import logger, settings
+
+
+VERSION_KEY = "permissions:version"
+
+
+def _role_name(role: str | Enum) -> str:
+    return role.value if isinstance(role, Enum) else role
+
+
+class PermissionCache:
+    """
+    In-process ``role -> frozenset(route names)`` map used by ``require_role``.
+
+    The map is loaded once at startup. Writes to the ``permission`` table bump
+    a version counter in Redis; every worker compares its loaded version with
+    the counter at most once per ``PERMISSION_CACHE_REFRESH_SECONDS`` and
+    reloads only when it moved, so permission checks never touch the database.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._permissions: dict[str, frozenset[str]] = {}
+        self._version: int | None = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        return not self._loaded or time.monotonic() - self._checked_at >= self.refresh_seconds
+
+    def load(self) -> None:
+        version = self._remote_version()
+
+        with Session(engine) as session:
+            rows = session.exec(select(Permission.name, Permission.roles)).all()
+
+        permissions: dict[str, set[str]] = defaultdict(set)
+        for name, roles in rows:
+            for role in roles or []:
+                permissions[_role_name(role)].add(name)
+
+        self._permissions = {role: frozenset(names) for role, names in permissions.items()}
+        self._version = version
+        self._loaded = True
+        self._checked_at = time.monotonic()
+
+    def refresh(self) -> None:
+        """Reload when the shared version changed (or nothing is loaded yet)."""
+
+        with self._lock:
+            if not self.is_stale:
+                return
+
+            if not self._loaded or self._remote_version() != self._version:
+                self.load()
+            else:
+                self._checked_at = time.monotonic()
+
+    async def arefresh(self) -> None:
+        if self.is_stale:
+            await run_in_threadpool(self.refresh)
+
+    def invalidate(self) -> None:
+        """Bump the shared version so every worker reloads on its next check."""
+
+        try:
+            get_redis().incr(VERSION_KEY)
+        except RedisError:
+            logger.warning("Could not bump %s, other workers keep their cache", VERSION_KEY)
+
+        self._loaded = False
+
+    def has_permission(self, roles: Iterable[str | Enum], route_name: str) -> bool:
+        return any(
+            route_name in self._permissions.get(_role_name(role), ())
+            for role in roles
+        )
+
+    def _remote_version(self) -> int | None:
+        try:
+            value = get_redis().get(VERSION_KEY)
+        except RedisError:
+            logger.warning("Could not read %s, keeping the loaded permissions", VERSION_KEY)
+            return self._version
+
+        return int(value) if value is not None else 0
+
+
+permission_cache = PermissionCache(settings.permission_cache_refresh_seconds)
+
+
+@event.listens_for(Permission, "after_insert")
+@event.listens_for(Permission, "after_update")
+@event.listens_for(Permission, "after_delete")
+def _mark_permissions_changed(mapper, connection, target) -> None:
+    ORMSession.object_session(target).info["permissions_changed"] = True
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _invalidate_permissions(session: ORMSession) -> None:
+    # Off the event loop when an AsyncSession commits, the bump is a Redis call
+    if session.info.pop("permissions_changed", False):
+        call_blocking(session, permission_cache.invalidate)
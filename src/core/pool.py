@@ -0,0 +1,117 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from src.settings import logger, settings
+
+
+class PoolStats:
+    """Cumulative checkout counters for one connection pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_total, 6),
+                "wait_seconds_avg": round(self.wait_total / waits, 6) if waits else 0.0,
+                "wait_seconds_max": round(self.wait_max, 6),
+            }
+
+
+class InstrumentedPoolMixin:
+    """Times every checkout from the pool queue and counts pool timeouts."""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            waited = time.perf_counter() - start
+            self.stats.record_wait(waited, timed_out=True)
+            logger.warning(
+                "Database pool timeout after %.3fs (%s)", waited, self.status()
+            )
+            raise
+
+        waited = time.perf_counter() - start
+        self.stats.record_wait(waited)
+        if waited >= settings.db_pool_conf.slow_checkout_seconds:
+            logger.warning(
+                "Slow database pool checkout %.3fs (%s)", waited, self.status()
+            )
+        return connection
+
+    def pool_stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            **self.stats.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+
+@event.listens_for(Pool, "invalidate")
+def _log_invalidated(dbapi_connection, connection_record, exception) -> None:
+    logger.warning("Database connection invalidated: %r", exception)
+
+
+def engine_options(async_driver: bool = False) -> dict:
+    """``create_engine`` keyword arguments built from ``settings.db_pool_conf``."""
+
+    conf = settings.db_pool_conf
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if async_driver else InstrumentedQueuePool,
+        "pool_size": conf.size,
+        "max_overflow": conf.max_overflow,
+        "pool_timeout": conf.timeout,
+        "pool_recycle": conf.recycle,
+        "pool_pre_ping": conf.pre_ping,
+    }
+
+    if conf.statement_timeout_ms:
+        if async_driver:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(conf.statement_timeout_ms)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={conf.statement_timeout_ms}"
+            }
+
+    return options
@@ -0,0 +1,145 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.settings import logger, settings
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class QueryProfile:
+    """SQL statements executed while handling one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    @property
+    def duplicates(self) -> int:
+        """Statements that ran again with the same SQL, the usual N+1 shape."""
+
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        common = self.statements.most_common(1)
+        return common[0] if common and common[0][1] > 1 else None
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.seconds * 1000:.1f};desc="{self.queries} queries", '
+            f'db-dup;desc="{self.duplicates} duplicate"'
+        )
+
+
+# Threadpool calls run in a copy of the request context, so statements from
+# sync sessions land in the same profile as those from the async engine.
+current_profile: ContextVar[QueryProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """Profile the statements run inside the block, joining an outer profile."""
+
+    profile = current_profile.get()
+    if profile is not None:
+        yield profile
+        return
+
+    profile = QueryProfile()
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+
+    if settings.slow_query_seconds and elapsed >= settings.slow_query_seconds:
+        logger.warning("Slow query %.3fs: %s", elapsed, statement[:500])
+
+    profile = current_profile.get()
+    if profile is not None:
+        profile.record(statement, elapsed)
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Cap the SQL statements a route may run per request.
+
+    Overruns are logged, and raise ``QueryBudgetExceeded`` when
+    ``QUERY_BUDGET_STRICT`` is set, which the test suite does.
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.query_budget = max_queries
+        return endpoint
+
+    return decorator
+
+
+class QueryProfilerMiddleware:
+    """
+    Profiles each request's SQL, checks the route's ``query_budget`` and,
+    with ``server_timing``, reports the profile in a ``Server-Timing`` header.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries() as profile:
+            async def send_wrapper(message: Message) -> None:
+                if self.server_timing and message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", profile.server_timing())
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+            self.check_budget(scope, profile)
+
+    def check_budget(self, scope: Scope, profile: QueryProfile) -> None:
+        route = scope.get("route")
+        budget = getattr(getattr(route, "endpoint", None), "query_budget", None)
+        if budget is None or profile.queries <= budget:
+            return
+
+        repeated = profile.most_repeated()
+        message = (
+            f"{scope['method']} {route.path} ran {profile.queries} queries, "
+            f"budget is {budget}"
+        )
+        if repeated:
+            message += f"; repeated {repeated[1]}x: {repeated[0][:200]}"
+
+        logger.warning(message)
+        if settings.query_budget_strict:
+            raise QueryBudgetExceeded(message)
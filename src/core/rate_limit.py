@@ -0,0 +1,129 @@
+import math
+import time
+import uuid
+
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from redis.exceptions import RedisError
+
+from src.core.redis import get_redis
+from src.settings import RATE_PATTERN, logger
+
+
+UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_rate(rate: str | None) -> tuple[int, float]:
+    """``"10/m"`` -> ``(10, 60.0)``; units are s, m or h. Empty means unlimited."""
+
+    if not rate or not rate.strip():
+        return 0, 0.0
+
+    match = RATE_PATTERN.fullmatch(rate.strip())
+    if match is None:
+        raise ValueError(f"{rate!r} is not a rate like '30/m' (units s, m or h)")
+    count, unit = match.groups()
+    return int(count), float(UNITS[unit[0]])
+
+
+def raise_too_many(retry_after: float) -> None:
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many attempts, retry later",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def client_ip(request: Request) -> str:
+    """
+    Address limits are keyed on. Behind a reverse proxy or load balancer
+    this is the proxy unless uvicorn runs with ``--proxy-headers`` and
+    ``--forwarded-allow-ips`` set to the proxy's address, which makes it
+    take the client from ``X-Forwarded-For``.
+    """
+
+    return request.client.host if request.client else "unknown"
+
+
+class SlidingWindowLimit:
+    """
+    At most ``limit`` hits per key in any ``window``-second span, shared by
+    every worker through a Redis sorted set of hit timestamps. Attempts over
+    the limit are not recorded, so a client that backs off gets through once
+    its oldest hit leaves the window. Redis errors let requests through.
+    """
+
+    def __init__(self, name: str, rate: str | None):
+        self.name = name
+        self.limit, self.window = parse_rate(rate)
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def key(self, key: str) -> str:
+        return f"ratelimit:{self.name}:{key}"
+
+    def _retry_after(self, oldest: list, now: float) -> float:
+        return oldest[0][1] + self.window - now if oldest else self.window
+
+    def hit(self, key: str) -> float | None:
+        """Record a hit; returns seconds to wait when over the limit, else None."""
+
+        if not self.enabled:
+            return None
+
+        key = self.key(key)
+        now = time.time()
+        member = f"{now}:{uuid.uuid4().hex[:8]}"
+        try:
+            pipe = get_redis().pipeline()
+            pipe.zremrangebyscore(key, 0, now - self.window)
+            pipe.zadd(key, {member: now})
+            pipe.zcard(key)
+            pipe.zrange(key, 0, 0, withscores=True)
+            pipe.expire(key, math.ceil(self.window))
+            _, _, count, oldest, _ = pipe.execute()
+
+            if count > self.limit:
+                get_redis().zrem(key, member)
+                return self._retry_after(oldest, now)
+        except RedisError:
+            logger.warning("Rate limit %s unavailable, letting the request through", self.name)
+        return None
+
+    def blocked(self, key: str) -> float | None:
+        """Seconds to wait when ``key`` is already at the limit, without a hit."""
+
+        if not self.enabled:
+            return None
+
+        key = self.key(key)
+        now = time.time()
+        try:
+            pipe = get_redis().pipeline()
+            pipe.zremrangebyscore(key, 0, now - self.window)
+            pipe.zcard(key)
+            pipe.zrange(key, 0, 0, withscores=True)
+            _, count, oldest = pipe.execute()
+        except RedisError:
+            logger.warning("Rate limit %s unavailable, letting the request through", self.name)
+            return None
+
+        return self._retry_after(oldest, now) if count >= self.limit else None
+
+    async def ahit(self, key: str) -> None:
+        """Record a hit and raise 429 when over the limit."""
+
+        if self.enabled:
+            retry_after = await run_in_threadpool(self.hit, key)
+            if retry_after is not None:
+                raise_too_many(retry_after)
+
+    async def acheck(self, key: str) -> None:
+        """Raise 429 when ``key`` is at the limit, without recording a hit."""
+
+        if self.enabled:
+            retry_after = await run_in_threadpool(self.blocked, key)
+            if retry_after is not None:
+                raise_too_many(retry_after)
@@ -0,0 +1,16 @@
+from functools import cache
+
+from redis import Redis
+
+from src.settings import settings
+
+
+@cache
+def get_redis() -> Redis:
+    """One client (and connection pool) per process, created on first use."""
+
+    return Redis.from_url(
+        settings.redis_url,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_timeout,
+    )
@@ -0,0 +1,133 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import ORMExecuteState
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.settings import logger
+
+
+# Seconds the replica is behind the primary; 0 when it has replayed
+# everything it received (an idle primary sends nothing new to replay).
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaSet:
+    """
+    Round-robin over replica engines that are within ``max_lag`` seconds of
+    the primary. Each replica's lag is measured at most once per
+    ``check_interval``; a replica that is too far behind or unreachable is
+    skipped until its next check, and ``choose`` returns None (use the
+    primary) when none qualifies.
+    """
+
+    def __init__(self, engines: list[Engine], max_lag: float, check_interval: float):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._healthy: dict[int, tuple[float, bool]] = {}
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def lag(self, engine: Engine) -> float:
+        with engine.connect() as connection:
+            return float(connection.execute(LAG_QUERY).scalar() or 0)
+
+    def is_healthy(self, index: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            checked = self._healthy.get(index)
+            if checked is not None and now - checked[0] < self.check_interval:
+                return checked[1]
+            # Other callers keep the previous verdict while this one checks
+            self._healthy[index] = (now, checked[1] if checked else True)
+
+        try:
+            lag = self.lag(self.engines[index])
+            healthy = lag <= self.max_lag
+            if not healthy:
+                logger.warning("Replica %d is %.1fs behind, reading from the primary", index, lag)
+        except SQLAlchemyError:
+            logger.warning("Replica %d is unreachable, reading from the primary", index)
+            healthy = False
+
+        with self._lock:
+            self._healthy[index] = (time.monotonic(), healthy)
+        return healthy
+
+    def choose(self) -> Engine | None:
+        start = next(self._next)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self.is_healthy(index):
+                return self.engines[index]
+        return None
+
+
+class RoutingSession(Session):
+    """
+    Session on the primary that sends reads inside ``replica_reads`` to a
+    replica from ``replicas``. Once the session has written anything, every
+    later statement stays on the primary, so a request reads its own writes.
+
+    For async sessions pass ``sync_session_class=RoutingSession`` to
+    ``AsyncSession`` along with a ``ReplicaSet`` of ``AsyncEngine.sync_engine``.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get("replica") and not self.info.get("wrote") and not self._flushing:
+            replica = self.replicas.choose()
+            if replica is not None:
+                return replica
+
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_flushed(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_written(orm_execute_state: ORMExecuteState) -> None:
+    # Bulk UPDATE/DELETE/INSERT statements skip the flush
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@contextmanager
+def replica_reads(session: Session | AsyncSession) -> Iterator[None]:
+    """
+    Allow the statements inside the block to read from a replica. Without
+    replicas configured, or on a plain ``Session``, this changes nothing.
+    """
+
+    if session.info.get("replica"):
+        yield
+        return
+
+    session.info["replica"] = True
+    try:
+        yield
+    finally:
+        session.info.pop("replica", None)
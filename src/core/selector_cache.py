@@ -0,0 +1,240 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable
+from weakref import WeakValueDictionary
+
+from fastapi.concurrency import run_in_threadpool
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session as ORMSession
+
+from src.core.cache import TTLCache
+from src.core.database import call_blocking
+from src.core.redis import get_redis
+from src.settings import logger, settings
+
+
+MISSING = object()
+CHANGED_KEY = "selector_cache_changed"
+
+
+class SelectorCache:
+    """
+    Two-tier cache of ``Selector`` reads for one model: an in-process LRU in
+    front of Redis, both holding JSON-able row data.
+
+    Keys embed a per-model version kept in Redis. Any committed write to the
+    model (ORM flush or bulk statement) bumps it, which orphans every cached
+    entry at once; other workers pick up the new version within
+    ``SELECTOR_CACHE_VERSION_SECONDS``. On a miss only one caller per key
+    loads from the database: within a worker through a local lock, across
+    workers through a short Redis ``SET NX`` lock the others wait on.
+    Redis errors fall back to the database.
+    """
+
+    registry: dict[type, "SelectorCache"] = {}
+
+    def __init__(
+        self,
+        model: type,
+        ttl: float,
+        maxsize: int = 10000,
+        version_seconds: float = 1.0,
+        lock_seconds: float = 1.0,
+    ):
+        self.model = model
+        self.name = model.__tablename__
+        self.ttl = ttl
+        self.version_seconds = version_seconds
+        self.lock_seconds = lock_seconds
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._version: int | None = None
+        self._version_checked = 0.0
+        self._key_locks: WeakValueDictionary[str, threading.Lock] = WeakValueDictionary()
+        self._locks_lock = threading.Lock()
+
+        if self.enabled:
+            self.registry[model] = self
+            for name in ("after_insert", "after_update", "after_delete"):
+                event.listen(model, name, _mark_changed)
+
+    @classmethod
+    def for_model(cls, model: type) -> "SelectorCache":
+        """Cache with the TTL configured for ``model`` in ``SELECTOR_CACHE_TTLS``."""
+
+        return cls(
+            model,
+            ttl=settings.selector_cache_ttls.get(model.__tablename__, 0),
+            maxsize=settings.selector_cache_max_size,
+            version_seconds=settings.selector_cache_version_seconds,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def version_key(self) -> str:
+        return f"selector:{self.name}:version"
+
+    def version(self) -> int:
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked >= self.version_seconds:
+            try:
+                self._version = int(get_redis().get(self.version_key) or 0)
+            except RedisError:
+                logger.warning("Could not read %s, keeping version %s", self.version_key, self._version)
+                self._version = self._version or 0
+            self._version_checked = now
+        return self._version
+
+    def key(self, key: str) -> str:
+        return f"selector:{self.name}:{self.version()}:{key}"
+
+    def invalidate(self) -> None:
+        try:
+            self._version = int(get_redis().incr(self.version_key))
+            self._version_checked = time.monotonic()
+        except RedisError:
+            logger.warning("Could not bump %s, other workers serve cached rows until their TTL", self.version_key)
+            self._version = None
+        self.local.clear()
+
+    # Steps shared by the sync and async lookups
+
+    def _local_lock(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _remote_get(self, key: str) -> Any:
+        try:
+            raw = get_redis().get(key)
+        except RedisError:
+            return MISSING
+        return MISSING if raw is None else json.loads(raw)
+
+    def _acquire(self, key: str) -> bool | None:
+        """True when this caller should load; None when Redis is unavailable."""
+
+        try:
+            return bool(get_redis().set(f"{key}:lock", 1, nx=True, px=int(self.lock_seconds * 1000)))
+        except RedisError:
+            return None
+
+    def _store(self, key: str, data: Any, locked: bool | None) -> None:
+        self.local.set(key, data)
+        try:
+            pipe = get_redis().pipeline()
+            pipe.set(key, json.dumps(data), ex=max(1, int(self.ttl)))
+            if locked:
+                pipe.delete(f"{key}:lock")
+            pipe.execute()
+        except RedisError:
+            logger.warning("Could not write %s to Redis", key)
+
+    def _unlock(self, key: str) -> None:
+        # Nothing to store (row not found), let the waiting workers load it now
+        try:
+            get_redis().delete(f"{key}:lock")
+        except RedisError:
+            logger.warning("Could not release %s:lock", key)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Cached data for ``key``, calling ``loader`` on a miss. A ``None``
+        result (row not found) is returned but not cached.
+        """
+
+        key = self.key(key)
+        data = self.local.get(key, MISSING)
+        if data is not MISSING:
+            return data
+
+        with self._local_lock(key):
+            data = self.local.get(key, MISSING)
+            if data is MISSING:
+                data = self._remote_get(key)
+            if data is not MISSING:
+                self.local.set(key, data)
+                return data
+
+            locked = self._acquire(key)
+            if locked is False:
+                deadline = time.monotonic() + self.lock_seconds
+                while time.monotonic() < deadline:
+                    time.sleep(0.01)
+                    data = self._remote_get(key)
+                    if data is not MISSING:
+                        self.local.set(key, data)
+                        return data
+
+            data = loader()
+            if data is not None:
+                self._store(key, data, locked)
+            elif locked:
+                self._unlock(key)
+            return data
+
+    async def aget_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        key = self.key(key)
+        data = self.local.get(key, MISSING)
+        if data is not MISSING:
+            return data
+
+        data = await run_in_threadpool(self._remote_get, key)
+        if data is not MISSING:
+            self.local.set(key, data)
+            return data
+
+        locked = await run_in_threadpool(self._acquire, key)
+        if locked is False:
+            deadline = time.monotonic() + self.lock_seconds
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+                data = await run_in_threadpool(self._remote_get, key)
+                if data is not MISSING:
+                    self.local.set(key, data)
+                    return data
+
+        data = await loader()
+        if data is not None:
+            await run_in_threadpool(self._store, key, data, locked)
+        elif locked:
+            await run_in_threadpool(self._unlock, key)
+        return data
+
+
+def _mark_changed(mapper, connection, target) -> None:
+    session = ORMSession.object_session(target)
+    if session is not None:
+        session.info.setdefault(CHANGED_KEY, set()).add(type(target))
+
+
+@event.listens_for(ORMSession, "do_orm_execute")
+def _mark_bulk_changed(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_select:
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in SelectorCache.registry:
+        orm_execute_state.session.info.setdefault(CHANGED_KEY, set()).add(mapper.class_)
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _invalidate_changed(session: ORMSession) -> None:
+    for model in session.info.pop(CHANGED_KEY, ()):
+        cache = SelectorCache.registry.get(model)
+        if cache is not None:
+            # Off the event loop when an AsyncSession commits, the bump is a Redis call
+            call_blocking(session, cache.invalidate)
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def _forget_changed(session: ORMSession) -> None:
+    session.info.pop(CHANGED_KEY, None)
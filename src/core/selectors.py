@@ -1,15 +1,77 @@
-from typing import Annotated, Any
+import base64
+import binascii
+import json
+from datetime import datetime, UTC
+from typing import Annotated, Any, Awaitable
 from uuid import UUID
-from sqlmodel import SQLModel, select
-from sqlalchemy import ARRAY
+from pydantic import BaseModel
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import ARRAY, cast, delete, tuple_, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert
 
 from fastapi import HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 
-from src.core.database import SessionDep
+from src.core.database import SessionDep, acommit
+from src.core.replicas import replica_reads
+from src.core.selector_cache import SelectorCache
+
+
+class Page(BaseModel):
+    items: list[Any]
+    next_cursor: str | None = None
+
+
+def encode_cursor(created: datetime, id: UUID) -> str:
+    raw = json.dumps([created.isoformat(), str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created, id = json.loads(raw)
+        return datetime.fromisoformat(created), UUID(id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+async def _dumped(selector: type["Selector"], rows: Awaitable[Any]) -> Any:
+    """Await a fetch for ``aget_or_load`` and dump the row(s) it returns."""
+
+    result = await rows
+    if isinstance(result, (list, tuple)):
+        return [selector.dump(item) for item in result]
+    return selector.dump(result)
 
 
 class Selector:
+    """
+    Generic CRUD helpers for ``cls.model``.
+
+    List reads come in two flavours: ``all``/``filter`` page with
+    ``offset``/``limit``, ``all_page``/``filter_page`` page on the
+    ``(created, id)`` key and return a ``Page`` with an opaque
+    ``next_cursor``, so every page costs the same index range scan.
+    An empty or missing cursor starts from the first row.
+
+    ``all``/``get``/``filter`` and their variants read through
+    ``replica_reads``, so they use a read replica when one is configured and
+    the session has not written yet.
+
+    For hot list routes, ``all_rows`` selects only the columns of a response
+    schema and ``project`` turns loaded rows into plain dicts; both skip
+    Pydantic validation and pair with ``FastJSONResponse``.
+    """
+
     model: Any
+    # Two-tier read cache for ``get``/``filter``, see ``SelectorCache``
+    cache: SelectorCache | None = None
+    # Columns never written to the cache (secrets), mapped to the value
+    # instances rebuilt from it get instead
+    cache_exclude: dict[str, Any] = {}
 
     @classmethod
     def all(
@@ -18,7 +80,8 @@ class Selector:
         offset: int = 0,
         limit: Annotated[int, Query(le=100)] = 100,
     ):
-        items = session.exec(select(cls.model).offset(offset).limit(limit)).all()
+        with replica_reads(session):
+            items = session.exec(select(cls.model).offset(offset).limit(limit)).all()
         return items
 
     @classmethod
@@ -31,11 +94,30 @@ class Selector:
 
     @classmethod
     def get(cls, id: UUID, session: SessionDep):
-        item = session.get(cls.model, id)
+        """
+        Row ``id`` or 404. With a cache configured the row may come back as a
+        detached, session-less instance rebuilt from cached data, with the
+        ``cache_exclude`` columns blanked: read it, but re-fetch (or
+        ``session.merge``) before writing, ``session.add`` would INSERT it.
+        """
+
+        if cls.cached():
+            data = cls.cache.get_or_load(
+                f"get:{id}", lambda: cls.dump(cls.fetch(id, session))
+            )
+            item = cls.load(data)
+        else:
+            item = cls.fetch(id, session)
+
         if not item:
             raise HTTPException(status_code=404, detail="not found")
         return item
 
+    @classmethod
+    def fetch(cls, id: UUID, session: SessionDep):
+        with replica_reads(session):
+            return session.get(cls.model, id)
+
     @classmethod
     def update(cls, id: UUID, account: SQLModel, session: SessionDep):
         item = session.get(cls.model, id)
@@ -61,6 +143,21 @@ class Selector:
 
         return {"ok": True}
 
+    @classmethod
+    def filter_expression(cls, field: str, value: Any):
+        column = getattr(cls.model, field, None)
+        if column is None:
+            raise HTTPException(status_code=400, detail="invalid filter field")
+
+        if isinstance(column.type, ARRAY):
+            # ``roles @> ARRAY[...]`` can use the GIN index on the column,
+            # ``value = ANY(roles)`` always scans. The generic ARRAY type the
+            # models use has no ``contains``, so the operator is spelled out.
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            return column.op("@>")(cast(values, postgresql.ARRAY(column.type.item_type)))
+
+        return column == value
+
     @classmethod
     def filter(
         cls,
@@ -70,20 +167,418 @@ class Selector:
         offset: int = 0,
         limit: Annotated[int, Query(le=100)] = 100,
     ):
-        column = getattr(cls.model, field, None)
-        if column is None:
-            raise HTTPException(status_code=400, detail="invalid filter field")
+        filter_expr = cls.filter_expression(field, value)
+        statement = select(cls.model).where(filter_expr).offset(offset).limit(limit)
 
-        if isinstance(column.type, ARRAY):
-            if isinstance(value, (list, tuple, set)):
-                filter_expr = column.contains(list(value))
-            else:
-                filter_expr = column.any(value)
-        else:
-            filter_expr = column == value
+        def fetch():
+            with replica_reads(session):
+                return session.exec(statement).all()
+
+        if cls.cached():
+            key = cls.filter_key(field, value, offset, limit)
+            return [cls.load(data) for data in cls.cache.get_or_load(
+                key, lambda: [cls.dump(item) for item in fetch()]
+            )]
+        return fetch()
+
+    # Read cache helpers. Cached reads return fresh, session-less instances
+    # rebuilt from JSON row data, see ``get``.
+
+    @classmethod
+    def cached(cls) -> bool:
+        return cls.cache is not None and cls.cache.enabled
+
+    @classmethod
+    def dump(cls, item: Any) -> dict | None:
+        if item is None:
+            return None
+        return item.model_dump(mode="json", exclude=set(cls.cache_exclude))
+
+    @classmethod
+    def load(cls, data: dict | None) -> Any:
+        return cls.model.model_validate({**data, **cls.cache_exclude}) if data is not None else None
+
+    @classmethod
+    def filter_key(cls, field: str, value: Any, offset: int, limit: int) -> str:
+        return f"filter:{field}:{json.dumps(value, default=str)}:{offset}:{limit}"
+
+    @classmethod
+    def keyset_statement(cls, cursor: str | None, limit: int, where: Any = None):
+        statement = select(cls.model)
+        if where is not None:
+            statement = statement.where(where)
+        if cursor:
+            created, id = decode_cursor(cursor)
+            statement = statement.where(
+                tuple_(cls.model.created, cls.model.id) > tuple_(created, id)
+            )
+
+        # One extra row tells whether there is a next page
+        return statement.order_by(cls.model.created, cls.model.id).limit(limit + 1)
+
+    @classmethod
+    def to_page(cls, items: list[Any], limit: int) -> Page:
+        if len(items) <= limit:
+            return Page(items=items)
+
+        items = items[:limit]
+        last = items[-1]
+        return Page(items=items, next_cursor=encode_cursor(last.created, last.id))
+
+    @classmethod
+    def all_page(
+        cls,
+        session: SessionDep,
+        cursor: str | None = None,
+        limit: Annotated[int, Query(le=100)] = 100,
+    ) -> Page:
+        with replica_reads(session):
+            items = session.exec(cls.keyset_statement(cursor, limit)).all()
+        return cls.to_page(list(items), limit)
+
+    @classmethod
+    def filter_page(
+        cls,
+        session: SessionDep,
+        field: str,
+        value: Any,
+        cursor: str | None = None,
+        limit: Annotated[int, Query(le=100)] = 100,
+    ) -> Page:
+        filter_expr = cls.filter_expression(field, value)
+        with replica_reads(session):
+            items = session.exec(cls.keyset_statement(cursor, limit, filter_expr)).all()
+        return cls.to_page(list(items), limit)
+
+    @classmethod
+    def columns(cls, schema: type[BaseModel]) -> list:
+        return [getattr(cls.model, name) for name in schema.model_fields]
+
+    @classmethod
+    def project(cls, items: list[Any], schema: type[BaseModel]) -> list[dict]:
+        """Copy ``schema``'s fields out of loaded rows, without validation."""
+
+        names = tuple(schema.model_fields)
+        return [{name: getattr(item, name) for name in names} for item in items]
+
+    @classmethod
+    def all_rows(
+        cls,
+        session: SessionDep,
+        schema: type[BaseModel],
+        offset: int = 0,
+        limit: Annotated[int, Query(le=100)] = 100,
+    ) -> list[dict]:
+        """Like ``all`` but reads only ``schema``'s columns into plain dicts."""
+
+        statement = select(*cls.columns(schema)).offset(offset).limit(limit)
+        with replica_reads(session):
+            return [dict(row) for row in session.execute(statement).mappings()]
+
+    @classmethod
+    def bulk_where(
+        cls,
+        ids: list[UUID] | None = None,
+        field: str | None = None,
+        value: Any = None,
+    ):
+        if ids:
+            return cls.model.id.in_(ids)
+        if field is not None:
+            return cls.filter_expression(field, value)
+        raise HTTPException(status_code=400, detail="bulk operations need ids or a filter")
+
+    @classmethod
+    def after_bulk_write(cls, ids: list[UUID] | None) -> None:
+        """Hook for subclasses that cache rows; ``ids`` is None for filter writes."""
+
+    @classmethod
+    def bulk_insert_statement(cls):
+        # Rows that hit a unique constraint are skipped instead of failing the batch
+        return insert(cls.model).on_conflict_do_nothing().returning(cls.model)
+
+    @classmethod
+    def bulk_rows(cls, items: list[Any]) -> list[dict]:
+        return [cls.model.model_validate(item).model_dump() for item in items]
+
+    @classmethod
+    def bulk_insert(cls, rows: list[dict], session: SessionDep):
+        if not rows:
+            return []
+
+        items = session.execute(cls.bulk_insert_statement(), rows).scalars().all()
+        session.commit()
+        return items
+
+    @classmethod
+    def bulk_create(cls, items: list[Any], session: SessionDep):
+        """Insert ``items`` in one multi-row INSERT, returning the created rows."""
+
+        return cls.bulk_insert(cls.bulk_rows(items), session)
+
+    @classmethod
+    def bulk_update(
+        cls,
+        values: dict[str, Any],
+        session: SessionDep,
+        ids: list[UUID] | None = None,
+        field: str | None = None,
+        value: Any = None,
+    ) -> int:
+        """Apply ``values`` to the rows matched by ``ids`` or ``field``/``value``."""
+
+        if not values:
+            return 0
+
+        statement = (
+            update(cls.model)
+            .where(cls.bulk_where(ids, field, value))
+            .values({**values, "modified": datetime.now(UTC)})
+            .execution_options(synchronize_session=False)
+        )
+        count = session.execute(statement).rowcount
+        session.commit()
+
+        cls.after_bulk_write(ids if ids else None)
+        return count
 
-        items = (
-            session.exec(select(cls.model).where(filter_expr).offset(offset).limit(limit))
-            .all()
+    @classmethod
+    def bulk_delete(
+        cls,
+        session: SessionDep,
+        ids: list[UUID] | None = None,
+        field: str | None = None,
+        value: Any = None,
+    ) -> int:
+        statement = (
+            delete(cls.model)
+            .where(cls.bulk_where(ids, field, value))
+            .execution_options(synchronize_session=False)
         )
+        count = session.execute(statement).rowcount
+        session.commit()
+
+        cls.after_bulk_write(ids if ids else None)
+        return count
+
+    # Async variants. They take an ``AsyncSession`` from ``AsyncSessionDep``;
+    # a sync ``Session`` (``DATABASE_ASYNC`` off) is accepted too and the sync
+    # method runs on the threadpool, so routes can be written once for both modes.
+
+    @classmethod
+    async def aall(
+        cls,
+        session: AsyncSession | Session,
+        offset: int = 0,
+        limit: Annotated[int, Query(le=100)] = 100,
+    ):
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.all, session, offset, limit)
+
+        with replica_reads(session):
+            result = await session.exec(select(cls.model).offset(offset).limit(limit))
+        return result.all()
+
+    @classmethod
+    async def aall_rows(
+        cls,
+        session: AsyncSession | Session,
+        schema: type[BaseModel],
+        offset: int = 0,
+        limit: Annotated[int, Query(le=100)] = 100,
+    ) -> list[dict]:
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.all_rows, session, schema, offset, limit)
+
+        statement = select(*cls.columns(schema)).offset(offset).limit(limit)
+        with replica_reads(session):
+            result = await session.execute(statement)
+        return [dict(row) for row in result.mappings()]
+
+    @classmethod
+    async def acreate(cls, item: Any, session: AsyncSession | Session):
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.create, item, session)
+
+        item = cls.model.model_validate(item)
+        session.add(item)
+        await acommit(session)
+        await session.refresh(item)
+        return item
+
+    @classmethod
+    async def aget(cls, id: UUID, session: AsyncSession | Session):
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.get, id, session)
+
+        async def fetch():
+            with replica_reads(session):
+                return await session.get(cls.model, id)
+
+        if cls.cached():
+            item = cls.load(await cls.cache.aget_or_load(
+                f"get:{id}", lambda: _dumped(cls, fetch())
+            ))
+        else:
+            item = await fetch()
+
+        if not item:
+            raise HTTPException(status_code=404, detail="not found")
+        return item
+
+    @classmethod
+    async def aupdate(cls, id: UUID, account: SQLModel, session: AsyncSession | Session):
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.update, id, account, session)
+
+        item = await session.get(cls.model, id)
+        if not item:
+            raise HTTPException(status_code=404, detail="not found")
+
+        item_data = account.model_dump(exclude_unset=True)
+        item.sqlmodel_update(item_data)
+        session.add(item)
+        await acommit(session)
+        await session.refresh(item)
+
+        return item
+
+    @classmethod
+    async def adelete(cls, id: UUID, session: AsyncSession | Session):
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.delete, id, session)
+
+        item = await session.get(cls.model, id)
+        if not item:
+            raise HTTPException(status_code=404, detail="not found")
+
+        await session.delete(item)
+        await acommit(session)
+
+        return {"ok": True}
+
+    @classmethod
+    async def afilter(
+        cls,
+        session: AsyncSession | Session,
+        field: str,
+        value: Any,
+        offset: int = 0,
+        limit: Annotated[int, Query(le=100)] = 100,
+    ):
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.filter, session, field, value, offset, limit)
+
+        filter_expr = cls.filter_expression(field, value)
+        statement = select(cls.model).where(filter_expr).offset(offset).limit(limit)
+
+        async def fetch():
+            with replica_reads(session):
+                result = await session.exec(statement)
+            return result.all()
+
+        if cls.cached():
+            key = cls.filter_key(field, value, offset, limit)
+            return [cls.load(data) for data in await cls.cache.aget_or_load(
+                key, lambda: _dumped(cls, fetch())
+            )]
+        return await fetch()
+
+    @classmethod
+    async def aall_page(
+        cls,
+        session: AsyncSession | Session,
+        cursor: str | None = None,
+        limit: Annotated[int, Query(le=100)] = 100,
+    ) -> Page:
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.all_page, session, cursor, limit)
+
+        with replica_reads(session):
+            result = await session.exec(cls.keyset_statement(cursor, limit))
+        return cls.to_page(list(result.all()), limit)
+
+    @classmethod
+    async def afilter_page(
+        cls,
+        session: AsyncSession | Session,
+        field: str,
+        value: Any,
+        cursor: str | None = None,
+        limit: Annotated[int, Query(le=100)] = 100,
+    ) -> Page:
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(
+                cls.filter_page, session, field, value, cursor, limit
+            )
+
+        filter_expr = cls.filter_expression(field, value)
+        with replica_reads(session):
+            result = await session.exec(cls.keyset_statement(cursor, limit, filter_expr))
+        return cls.to_page(list(result.all()), limit)
+
+    @classmethod
+    async def abulk_insert(cls, rows: list[dict], session: AsyncSession | Session):
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.bulk_insert, rows, session)
+
+        if not rows:
+            return []
+
+        result = await session.execute(cls.bulk_insert_statement(), rows)
+        items = result.scalars().all()
+        await acommit(session)
         return items
+
+    @classmethod
+    async def abulk_create(cls, items: list[Any], session: AsyncSession | Session):
+        return await cls.abulk_insert(cls.bulk_rows(items), session)
+
+    @classmethod
+    async def abulk_update(
+        cls,
+        values: dict[str, Any],
+        session: AsyncSession | Session,
+        ids: list[UUID] | None = None,
+        field: str | None = None,
+        value: Any = None,
+    ) -> int:
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.bulk_update, values, session, ids, field, value)
+
+        if not values:
+            return 0
+
+        statement = (
+            update(cls.model)
+            .where(cls.bulk_where(ids, field, value))
+            .values({**values, "modified": datetime.now(UTC)})
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(statement)
+        await acommit(session)
+
+        await run_in_threadpool(cls.after_bulk_write, ids if ids else None)
+        return result.rowcount
+
+    @classmethod
+    async def abulk_delete(
+        cls,
+        session: AsyncSession | Session,
+        ids: list[UUID] | None = None,
+        field: str | None = None,
+        value: Any = None,
+    ) -> int:
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.bulk_delete, session, ids, field, value)
+
+        statement = (
+            delete(cls.model)
+            .where(cls.bulk_where(ids, field, value))
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(statement)
+        await acommit(session)
+
+        await run_in_threadpool(cls.after_bulk_write, ids if ids else None)
+        return result.rowcount
@@ -0,0 +1,110 @@
+import time
+from functools import cache
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.database import async_engine, async_replica_engines, engine, replica_engines
+from src.core.hashing import password_hasher
+from src.settings import SchemaCheckEnum, logger, settings
+
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+@cache
+def alembic_heads() -> frozenset[str]:
+    """Head revisions of ``alembic/versions``, read once per process."""
+
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return frozenset(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+
+
+def database_heads() -> frozenset[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.connect() as connection:
+        return frozenset(MigrationContext.configure(connection).get_current_heads())
+
+
+def check_schema(mode: SchemaCheckEnum) -> None:
+    """
+    Compare the database's alembic revision with the migrations shipped in
+    the code. Alembic owns the schema, so startup neither creates nor
+    reflects tables; a mismatch stops the worker (``strict``) or is logged.
+    """
+
+    if mode == SchemaCheckEnum.off:
+        return
+
+    expected, current = alembic_heads(), database_heads()
+    if current == expected:
+        return
+
+    message = (
+        f"Database is at revision {', '.join(sorted(current)) or 'none'} but the code "
+        f"expects {', '.join(sorted(expected))}, run `alembic upgrade head`"
+    )
+    if mode == SchemaCheckEnum.strict:
+        raise SchemaOutOfDate(message)
+    logger.warning(message)
+
+
+def fill_pool(engine: Engine, connections: int) -> None:
+    """Open ``connections`` connections and leave them idle in the pool."""
+
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+async def afill_pool(engine: AsyncEngine, connections: int) -> None:
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(await engine.connect())
+    finally:
+        for connection in opened:
+            await connection.close()
+
+
+async def warm_up() -> None:
+    """
+    Do the first-request work up front: open ``DB_POOL_SIZE`` connections
+    per engine (replicas included) and start the password hashing workers.
+    The permission map is loaded by the lifespan either way.
+    """
+
+    start = time.perf_counter()
+    size = settings.db_pool_conf.size
+
+    await run_in_threadpool(fill_pool, engine, size)
+    if async_engine is not None:
+        await afill_pool(async_engine, size)
+
+    # A replica that is down must not keep the worker from starting
+    for i, replica in enumerate(replica_engines + async_replica_engines):
+        try:
+            if isinstance(replica, AsyncEngine):
+                await afill_pool(replica, size)
+            else:
+                await run_in_threadpool(fill_pool, replica, size)
+        except SQLAlchemyError:
+            logger.warning("Could not warm up replica %d", i)
+
+    await run_in_threadpool(password_hasher.warm_up)
+
+    logger.info("Warmed up in %.3fs", time.perf_counter() - start)
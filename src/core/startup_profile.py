@@ -0,0 +1,114 @@
+"""
+Import-time report for worker and test startup:
+
+    python -m src.core.startup_profile
+    python -m src.core.startup_profile --module src.tests.conftest --top 30
+
+Imports ``--module`` in a fresh interpreter under ``-X importtime`` and
+prints the wall time, the slowest imports and whether the lazily loaded
+integrations were pulled in anyway.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import Any, NamedTuple
+
+
+# Loaded on first use only, importing the app should not pull them in
+LAZY_MODULES = ("boto3", "botocore", "magic", "fastapi_mail")
+
+CHILD = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(",".join(name for name in {lazy!r} if name in sys.modules))
+"""
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """Rows of ``-X importtime`` output, nesting depth from the indentation."""
+
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append(ImportTime(
+            module=name.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=(len(name) - len(name.lstrip())) // 2,
+        ))
+    return rows
+
+
+def profile(module: str) -> dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD.format(module=module, lazy=LAZY_MODULES)],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    seconds, loaded = result.stdout.splitlines()[-2:]
+    return {
+        "module": module,
+        "seconds": float(seconds),
+        "imports": parse_importtime(result.stderr),
+        "lazy_loaded": [name for name in loaded.split(",") if name],
+    }
+
+
+def report(result: dict[str, Any], top: int) -> None:
+    imports: list[ImportTime] = result["imports"]
+    print(f"import {result['module']}: {result['seconds'] * 1000:.1f} ms, {len(imports)} modules")
+
+    # Top-level packages only, their cumulative time includes the submodules
+    packages: dict[str, int] = {}
+    for row in imports:
+        package = row.module.split(".")[0]
+        if row.depth == 0:
+            packages[package] = packages.get(package, 0) + row.cumulative_us
+
+    print("\nSlowest top-level imports (cumulative ms):")
+    for package, us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {us / 1000:>9.1f}  {package}")
+
+    print("\nSlowest modules (self ms):")
+    for row in sorted(imports, key=lambda row: -row.self_us)[:top]:
+        print(f"  {row.self_us / 1000:>9.1f}  {row.module}")
+
+    if result["lazy_loaded"]:
+        print(f"\nLoaded at import time but meant to be lazy: {', '.join(result['lazy_loaded'])}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report import time of a module.")
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print the raw numbers as JSON.")
+    args = parser.parse_args()
+
+    result = profile(args.module)
+    if args.json:
+        result["imports"] = [row._asdict() for row in result["imports"]]
+        print(json.dumps(result, indent=2))
+    else:
+        report(result, args.top)
+
+    return 1 if result["lazy_loaded"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,24 +4,49 @@ from fastapi import APIRouter, FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from src.settings import settings, EnvironmentEnum
-from src.core.database import create_db_and_tables
+from src.core.hashing import password_hasher
+from src.core.permissions import permission_cache
+from src.core.profiler import QueryProfilerMiddleware
+from src.core.startup import check_schema, warm_up
 from src.modules.users.routes import (
     users,
 )
 from src.modules.auth.routes import auth
+from src.modules.files.routes import files
+from src.modules.internal.routes import internal
+from src.modules.jobs.routes import jobs
 
 
 @asynccontextmanager
 async def lifespand(app: FastAPI):
-    create_db_and_tables()
+    check_schema(settings.schema_check)
+    permission_cache.load()
+    if settings.startup_warm_up:
+        await warm_up()
     yield
+    password_hasher.shutdown()
 
 
 app = FastAPI(lifespan=lifespand)
 
+# Server-Timing exposes query counts, keep it out of prod responses
+app.add_middleware(
+    QueryProfilerMiddleware,
+    server_timing=settings.environment != EnvironmentEnum.prod,
+)
+
+if settings.metrics_enabled:
+    from src.core.metrics import MetricsMiddleware, metrics_endpoint
+
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
 v1_router = APIRouter()
 v1_router.include_router(auth.router)
 v1_router.include_router(users.router)
+v1_router.include_router(files.router)
+v1_router.include_router(jobs.router)
+v1_router.include_router(internal.router)
 
 app.include_router(v1_router, prefix='/v1')
 
@@ -1,31 +1,49 @@
 from datetime import timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
 from src.core.authentication import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     Token,
-    authenticate_user,
-    create_access_token,
+    aauthenticate_user,
+    create_user_access_token,
 )
-from src.core.database import SessionDep
+from src.core.database import DBSessionDep
+from src.core.dependencies import password_hash_admission
+from src.core.profiler import query_budget
+from src.core.rate_limit import SlidingWindowLimit, client_ip
 from src.modules.users.models.users import CreateUser, UserPublic
 from src.modules.users.selectors import UserSelector
+from src.settings import settings
 
 
 router = APIRouter(prefix='/auth', tags=['Auth'])
 
+login_ip_limit = SlidingWindowLimit("login:ip", settings.login_rate_limit_ip)
+# Counts failed logins only, so the owner is not locked out by their own use
+login_account_limit = SlidingWindowLimit("login:account", settings.login_rate_limit_account)
+signup_ip_limit = SlidingWindowLimit("signup:ip", settings.signup_rate_limit_ip)
 
-@router.post("/login")
+
+# The hashing admission runs first: a saturated worker answers 503 before the
+# rate limit round trip, the user lookup or the hash.
+@router.post("/login", dependencies=[Depends(password_hash_admission)])
+@query_budget(2)
 async def login(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    session: SessionDep
+    session: DBSessionDep
 ) -> Token:
+    account = form_data.username.lower()
+    await login_ip_limit.ahit(client_ip(request))
+    await login_account_limit.acheck(account)
 
-    user = authenticate_user(form_data.username, form_data.password, session)
+    user = await aauthenticate_user(form_data.username, form_data.password, session)
     if not user:
+        await login_account_limit.ahit(account)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -33,15 +51,22 @@ async def login(
         )
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id)},
+    access_token = await run_in_threadpool(
+        create_user_access_token,
+        user,
         expires_delta=access_token_expires
     )
 
     return Token(access_token=access_token, token_type="bearer")
 
 
-@router.post("/signup", response_model=UserPublic)
-def signup(user: CreateUser, session: SessionDep):
-    return UserSelector.create(user, session)
+@router.post(
+    "/signup",
+    response_model=UserPublic,
+    dependencies=[Depends(password_hash_admission)],
+)
+@query_budget(3)
+async def signup(request: Request, user: CreateUser, session: DBSessionDep):
+    await signup_ip_limit.ahit(client_ip(request))
+    return await UserSelector.acreate(user, session)
 
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+
+from src.core.dependencies import CurrentUser
+from src.core.files import PresignedUpload, StaticFile, StoredFile, file_manager
+
+
+router = APIRouter(prefix='/files', tags=['Files'])
+
+
+class UploadRequest(BaseModel):
+    content_type: str
+    filename: str | None = None
+
+
+class CompleteUpload(BaseModel):
+    key: str
+
+
+@router.post("", response_model=StoredFile)
+async def upload_file(request: Request, current_user: CurrentUser):
+    """
+    Store the raw request body, its ``Content-Type`` being the file's.
+
+    The body is validated and written chunk by chunk as it arrives, so a
+    wrong type or an oversized upload is rejected after its first few KB
+    (or right away from ``Content-Length``) instead of once it is spooled.
+    """
+
+    content_type = request.headers.get("content-type")
+    if not content_type:
+        raise HTTPException(400, "File does not have a content_type")
+
+    validator = file_manager.validator(content_type)
+    length = request.headers.get("content-length")
+    if validator.max_size and length and length.isdigit() and int(length) > validator.max_size:
+        raise HTTPException(413, "File too large")
+
+    url = await file_manager.save_stream(request.stream(), content_type, validator)
+    return StoredFile(
+        key=url.removeprefix(f"{file_manager.base_url}/"),
+        url=url,
+        size=validator.size,
+        content_type=content_type,
+    )
+
+
+@router.post("/uploads", response_model=PresignedUpload)
+async def create_upload(payload: UploadRequest, current_user: CurrentUser):
+    """Issue a URL the client uploads to directly, bypassing the API workers."""
+
+    return await file_manager.presign_upload(
+        payload.content_type, str(current_user.id), payload.filename
+    )
+
+
+@router.post("/uploads/complete", response_model=StoredFile)
+async def complete_upload(payload: CompleteUpload, current_user: CurrentUser):
+    return await file_manager.complete_upload(payload.key, str(current_user.id))
+
+
+@router.get("/downloads")
+async def create_download(key: str, current_user: CurrentUser):
+    return {"url": await file_manager.presign_download(key, str(current_user.id))}
+
+
+@router.put("/local/{token}")
+async def receive_local_upload(token: str, request: Request):
+    """Stand-in for the storage endpoint when files live in ``static/``."""
+
+    if file_manager is not StaticFile:
+        raise HTTPException(404, "Not found")
+
+    key = await StaticFile.receive_upload(token, request.stream())
+    return {"key": key}
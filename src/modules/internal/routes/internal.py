@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from src.core.database import pool_stats
+from src.core.dependencies import CurrentSuperAdminUser
+
+
+router = APIRouter(prefix='/internal', tags=['Internal'])
+
+
+@router.get("/pool")
+async def read_pool_stats(current_user: CurrentSuperAdminUser):
+    """Live connection pool usage for this worker process."""
+
+    return pool_stats()
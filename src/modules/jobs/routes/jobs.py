@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException
+
+from src.core.dependencies import CurrentUser
+from src.core.jobs import JobStatus, ajob_owner, ajob_status
+from src.modules.users.enums import RoleEnum
+
+
+router = APIRouter(prefix='/jobs', tags=['Jobs'])
+
+
+@router.get("/{id}", response_model=JobStatus)
+async def get_job(id: str, current_user: CurrentUser):
+    """
+    State and progress of a job queued by the current user. Superadmins see
+    every job, unknown ids included, which report ``PENDING``.
+    """
+
+    if RoleEnum.superadmin not in current_user.roles:
+        if await ajob_owner(id) != str(current_user.id):
+            raise HTTPException(status_code=404, detail="Job not found")
+
+    return await ajob_status(id)
@@ -1,5 +1,7 @@
+from typing import Literal
 from uuid import UUID
-from pydantic import EmailStr
+from pydantic import EmailStr, model_validator
+from sqlalchemy import Index, text
 from sqlmodel import ARRAY, Field, SQLModel, String
 
 from src.core.models import BaseDBModel
@@ -7,7 +9,12 @@ from src.modules.users.enums import RoleEnum
 
 
 class Permission(BaseDBModel, table=True):
-    name: str
+    __table_args__ = (
+        Index("ix_permission_created_id", "created", "id"),
+        Index("ix_permission_roles", "roles", postgresql_using="gin"),
+    )
+
+    name: str = Field(index=True)
     roles: list[RoleEnum] = Field(
         default_factory=lambda: [RoleEnum.superadmin],
         sa_type=ARRAY(String),
@@ -28,6 +35,14 @@ class CreateUser(SQLModel):
 
 
 class User(BaseDBModel, table=True):
+    __table_args__ = (
+        Index("ix_user_created_id", "created", "id"),
+        Index("ix_user_roles", "roles", postgresql_using="gin"),
+        # Serves the case-insensitive login lookup and keeps emails unique
+        # regardless of case
+        Index("ux_user_email_lower", text("lower(email)"), unique=True),
+    )
+
     email: EmailStr = Field(unique=True)
     password: str
     roles: list[RoleEnum] = Field(
@@ -41,3 +56,35 @@ class UserPublic(SQLModel):
     id: UUID
     email: EmailStr
     roles: list[str]
+
+
+class BulkCreateUsers(SQLModel):
+    users: list[CreateUser] = Field(max_length=1000)
+
+
+class BulkUserFilter(SQLModel):
+    ids: list[UUID] | None = Field(default=None, max_length=10000)
+    field: Literal["roles", "disabled"] | None = None
+    value: RoleEnum | bool | None = None
+
+    @model_validator(mode="after")
+    def check_value_type(self):
+        # ``value`` is compared with ``field``, a mismatch would reach Postgres
+        if self.field == "roles" and not isinstance(self.value, RoleEnum):
+            raise ValueError("value must be a role when field is 'roles'")
+        if self.field == "disabled" and not isinstance(self.value, bool):
+            raise ValueError("value must be a boolean when field is 'disabled'")
+        return self
+
+
+class BulkUserValues(SQLModel):
+    roles: list[RoleEnum] | None = None
+    disabled: bool | None = None
+
+
+class BulkUpdateUsers(BulkUserFilter):
+    values: BulkUserValues
+
+
+class BulkResult(SQLModel):
+    count: int
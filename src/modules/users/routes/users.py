@@ -1,44 +1,168 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 
-from src.core.database import SessionDep
+from src.core.authentication import load_user
+from src.core.database import DBSessionDep
 from src.core.dependencies import CurrentSuperAdminUser, CurrentUser
-from src.modules.users.models.users import User, UserPublic
-from src.modules.users.selectors import UserSelector
+from src.core.http_cache import conditional_response, not_modified, render_json
+from src.core.responses import FastJSONResponse, dump_json
+from src.core.jobs import enqueue
+from src.core.profiler import query_budget
+from src.modules.users.models.users import (
+    BulkCreateUsers,
+    BulkResult,
+    BulkUpdateUsers,
+    BulkUserFilter,
+    User,
+    UserPublic,
+)
+from src.modules.users.selectors import UserSelector, user_list_cache, user_tags
+from src.tasks.tasks import disable_users
 
 
 router = APIRouter(prefix='/users', tags=['User'])
 
+# Responses are per user and must be revalidated with the ETag before reuse
+PRIVATE_REVALIDATE = "private, no-cache"
+
 
 @router.get("/", response_model=list[UserPublic])
-def read_users(
-    session: SessionDep,
+@query_budget(3)
+async def read_users(
+    request: Request,
+    session: DBSessionDep,
     current_user: CurrentSuperAdminUser,
     offset: int = 0,
     limit: Annotated[int, Query(le=100)] = 100,
+    cursor: str | None = None,
 ):
-    return UserSelector.all(session, offset, limit)
+    """
+    List users. Pass ``cursor`` (empty for the first page) to page on
+    ``(created, id)`` instead of ``offset``; the next cursor comes back in
+    the ``X-Next-Cursor`` header and is absent on the last page.
+
+    Pages carry an ETag and answer a matching ``If-None-Match`` with 304.
+    With ``RESPONSE_CACHE_SECONDS`` set, rendered pages are shared through
+    Redis until the next write to the user table.
+    """
+
+    cache_key = f"{offset}:{limit}:{cursor}"
+    cached = await user_list_cache.aget(cache_key)
+    if cached is not None:
+        body, headers = cached
+        return conditional_response(request, body, PRIVATE_REVALIDATE, headers)
+
+    headers = {}
+    if cursor is None:
+        rows = await UserSelector.aall_rows(session, UserPublic, offset, limit)
+    else:
+        page = await UserSelector.aall_page(session, cursor, limit)
+        rows = UserSelector.project(page.items, UserPublic)
+        if page.next_cursor:
+            headers["X-Next-Cursor"] = page.next_cursor
+
+    body = dump_json(rows)
+    await user_list_cache.aset(cache_key, body, headers)
+    return conditional_response(request, body, PRIVATE_REVALIDATE, headers)
 
 
 @router.get("/me/", response_model=User)
+@query_budget(2)
 async def read_users_me(
+    request: Request,
+    session: DBSessionDep,
     current_user: CurrentUser
 ):
-    return current_user
+    user = current_user
+    if not isinstance(current_user, User):
+        # Authorized from token claims, load the full profile
+        user = await load_user(current_user.id, session)
+        if user is None:
+            raise HTTPException(status_code=404, detail="not found")
+
+    return conditional_response(request, render_json(User, user), PRIVATE_REVALIDATE)
+
+
+# Bulk routes are declared before the ``/{id}`` routes so ``bulk`` is not
+# parsed as an id.
+@router.post("/bulk", response_model=list[UserPublic])
+async def bulk_create_users(
+    payload: BulkCreateUsers,
+    session: DBSessionDep,
+    current_user: CurrentSuperAdminUser,
+):
+    """Create many users at once; emails that already exist are skipped."""
+
+    users = await UserSelector.abulk_create(payload.users, session)
+    return FastJSONResponse(UserSelector.project(users, UserPublic))
+
+
+@router.patch("/bulk", response_model=BulkResult)
+async def bulk_update_users(
+    payload: BulkUpdateUsers,
+    session: DBSessionDep,
+    current_user: CurrentSuperAdminUser,
+):
+    count = await UserSelector.abulk_update(
+        payload.values.model_dump(exclude_none=True),
+        session,
+        payload.ids,
+        payload.field,
+        payload.value,
+    )
+    return BulkResult(count=count)
+
+
+@router.delete("/bulk", response_model=BulkResult)
+async def bulk_delete_users(
+    payload: BulkUserFilter,
+    session: DBSessionDep,
+    current_user: CurrentSuperAdminUser,
+):
+    count = await UserSelector.abulk_delete(session, payload.ids, payload.field, payload.value)
+    return BulkResult(count=count)
+
+
+@router.post("/bulk/disable", status_code=202)
+async def bulk_disable_users(
+    payload: BulkUserFilter,
+    current_user: CurrentSuperAdminUser,
+):
+    """Disable users by id in the background; poll the returned job for progress."""
+
+    if not payload.ids:
+        raise HTTPException(status_code=400, detail="ids are required")
+
+    return await enqueue(disable_users, payload.ids, owner=str(current_user.id))
 
 
+# GET is the cacheable form; POST is kept for existing clients
+@router.get("/{id}", response_model=UserPublic)
 @router.post("/{id}", response_model=UserPublic)
-def get_user(id: UUID, session: SessionDep, current_user: CurrentSuperAdminUser):
-    return UserSelector.get(id, session)
+@query_budget(3)
+async def get_user(
+    request: Request,
+    id: UUID,
+    session: DBSessionDep,
+    current_user: CurrentSuperAdminUser,
+):
+    # The tag comes from Redis, so a revalidation does not load the user
+    etag = await user_tags.aetag(id)
+    response = not_modified(request, etag, PRIVATE_REVALIDATE)
+    if response is not None:
+        return response
+
+    user = await UserSelector.aget(id, session)
+    return conditional_response(request, render_json(UserPublic, user), PRIVATE_REVALIDATE, etag=etag)
 
 
 @router.patch("/{id}", response_model=UserPublic)
-def update_user(id: UUID, user: UserPublic, session: SessionDep, current_user: CurrentUser):
-    return UserSelector.update(id, user, session)
+async def update_user(id: UUID, user: UserPublic, session: DBSessionDep, current_user: CurrentUser):
+    return await UserSelector.aupdate(id, user, session)
 
 
 @router.delete("/{id}")
-def delete_user(id: UUID, session: SessionDep, current_user: CurrentSuperAdminUser):
-    return UserSelector.delete(id, session)
+async def delete_user(id: UUID, session: DBSessionDep, current_user: CurrentSuperAdminUser):
+    return await UserSelector.adelete(id, session)
@@ -1,21 +1,52 @@
 from typing import Any, Optional
+from uuid import UUID
 
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.core.authentication import get_password_hash
-from src.core.database import SessionDep
+from src.core.authentication import (
+    aget_password_hash,
+    get_password_hash,
+    revoke_user_claims,
+    user_cache,
+)
+from src.core.hashing import password_hasher
+from src.core.http_cache import EntityTags, ResponseCache
+from src.core.permissions import permission_cache
+from src.core.database import SessionDep, acommit, call_blocking
+from src.core.selector_cache import SelectorCache
 from src.core.selectors import Selector
 from src.modules.users.enums import RoleEnum
 from src.modules.users.models.users import Permission, User
+from src.settings import settings
+
+
+# Rendered ``GET /v1/users/`` pages; any write to the user table drops them all
+user_list_cache = ResponseCache("users:list", settings.response_cache_seconds)
+# Validators of ``GET /v1/users/{id}``, dropped with the rest of the user's state
+user_tags = EntityTags("users")
 
 
 class PermissionSelector(Selector):
     model = Permission
+    cache = SelectorCache.for_model(Permission)
+
+    @classmethod
+    def after_bulk_write(cls, ids: list[UUID] | None) -> None:
+        # Bulk statements skip the ORM events that normally bump the version
+        permission_cache.invalidate()
 
 
 class UserSelector(Selector):
     model = User
+    cache = SelectorCache.for_model(User)
+    # Password hashes stay out of Redis and the in-process tier
+    cache_exclude = {"password": ""}
 
     @classmethod
     def create(
@@ -26,6 +57,10 @@ class UserSelector(Selector):
     ):
         db_user = User.model_validate(item)
         db_user.password = get_password_hash(db_user.password)
+        return cls.save_new(db_user, session, roles)
+
+    @classmethod
+    def save_new(cls, db_user: User, session: SessionDep, roles: list[RoleEnum]):
         if roles:
             db_user.roles = roles
 
@@ -41,3 +76,125 @@ class UserSelector(Selector):
 
         session.refresh(db_user)
         return db_user
+
+    @classmethod
+    async def acreate(
+        cls,
+        item: Any,
+        session: AsyncSession | Session,
+        roles: list[RoleEnum] = [RoleEnum.user]
+    ):
+        db_user = User.model_validate(item)
+        db_user.password = await aget_password_hash(db_user.password)
+
+        if not isinstance(session, AsyncSession):
+            return await run_in_threadpool(cls.save_new, db_user, session, roles)
+
+        if roles:
+            db_user.roles = roles
+
+        try:
+            session.add(db_user)
+            await acommit(session)
+        except IntegrityError:
+            await session.rollback()
+            raise HTTPException(403, "Integrity error, validate user data")
+        except Exception:
+            await session.rollback()
+            raise HTTPException(403, "Validate user data")
+
+        await session.refresh(db_user)
+        return db_user
+
+    @classmethod
+    def forget(cls, id: UUID | None) -> None:
+        """
+        Drop cached state and claims tokens of ``id``, or of every user when
+        None. ORM updates and deletes of a user call it on commit, whatever
+        wrote them; bulk statements through ``after_bulk_write``.
+        """
+
+        if id is None:
+            user_cache.clear()
+        else:
+            user_cache.invalidate(id)
+        user_tags.invalidate(id)
+
+        if settings.jwt_embed_claims:
+            revoke_user_claims(id)
+
+    @classmethod
+    def after_bulk_write(cls, ids: list[UUID] | None) -> None:
+        user_list_cache.invalidate()
+        if ids is None:
+            cls.forget(None)
+            return
+
+        for id in ids:
+            cls.forget(id)
+
+    @classmethod
+    def new_users(cls, items: list[Any], roles: list[RoleEnum]) -> list[User]:
+        users = [User.model_validate(item) for item in items]
+        if roles:
+            for user in users:
+                user.roles = roles
+        return users
+
+    @classmethod
+    def bulk_create(
+        cls,
+        items: list[Any],
+        session: SessionDep,
+        roles: list[RoleEnum] = [RoleEnum.user]
+    ):
+        users = cls.new_users(items, roles)
+        hashes = password_hasher.hash_many_sync([user.password for user in users])
+        for user, hashed in zip(users, hashes):
+            user.password = hashed
+
+        items = cls.bulk_insert(cls.bulk_rows(users), session)
+        user_list_cache.invalidate()
+        return items
+
+    @classmethod
+    async def abulk_create(
+        cls,
+        items: list[Any],
+        session: AsyncSession | Session,
+        roles: list[RoleEnum] = [RoleEnum.user]
+    ):
+        users = cls.new_users(items, roles)
+        hashes = await password_hasher.hash_many([user.password for user in users])
+        for user, hashed in zip(users, hashes):
+            user.password = hashed
+
+        items = await cls.abulk_insert(cls.bulk_rows(users), session)
+        await run_in_threadpool(user_list_cache.invalidate)
+        return items
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_users_changed(mapper, connection, target) -> None:
+    ORMSession.object_session(target).info["users_changed"] = True
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_user_changed(mapper, connection, target) -> None:
+    # Roles or status may have changed, tokens carrying the old ones must go
+    ORMSession.object_session(target).info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _invalidate_user_list(session: ORMSession) -> None:
+    if session.info.pop("users_changed", False):
+        call_blocking(session, user_list_cache.invalidate)
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _forget_changed_users(session: ORMSession) -> None:
+    for id in session.info.pop("changed_user_ids", ()):
+        call_blocking(session, UserSelector.forget, id)
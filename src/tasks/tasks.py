@@ -1,6 +1,66 @@
+import asyncio
+from uuid import UUID
+
+import aiosmtplib
+from sqlmodel import Session
+
 from src.core.celery import celery_app
+from src.core.database import engine
+from src.core.jobs import chunked_task
+from src.core.mail import build_message, smtp_pool
+from src.modules.users.selectors import UserSelector
+from src.settings import settings
+
+
+# One loop per worker process so pooled SMTP connections survive between tasks
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _run(coro):
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
 
 
 @celery_app.task()
 def dummy_task():
     print('tasks executed')
+
+
+@celery_app.task(
+    bind=True,
+    rate_limit=settings.mail_conf.rate_limit,
+    max_retries=settings.mail_conf.max_retries,
+)
+def send_emails(self, messages: list[list]):
+    """
+    Send ``[subject, recipients, body]`` items over the pooled SMTP
+    connections. Permanently rejected messages are logged and skipped;
+    connection errors and 4xx replies retry what is left.
+    """
+
+    pending = [
+        build_message(subject, recipients, body)
+        for subject, recipients, body in messages
+    ]
+    try:
+        _run(smtp_pool.send_messages(pending, skip_rejected=True))
+    except (aiosmtplib.SMTPException, OSError) as exc:
+        # Only what was not delivered yet goes back on the queue
+        remaining = messages[len(messages) - len(pending):]
+        raise self.retry(
+            args=[remaining],
+            exc=exc,
+            countdown=min(2 ** self.request.retries, 300),
+        )
+
+
+@chunked_task(chunk_size=500)
+def disable_users(ids: list[str]) -> int:
+    """Disable users in batches of 500, one UPDATE per batch."""
+
+    with Session(engine) as session:
+        return UserSelector.bulk_update(
+            {"disabled": True}, session, ids=[UUID(id) for id in ids]
+        )
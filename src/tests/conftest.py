@@ -1,8 +1,76 @@
+import os
+
+# Jobs run inline with results kept in-process, no broker needed
+os.environ.setdefault("CELERY_TASK_ALWAYS_EAGER", "true")
+os.environ.setdefault("CELERY_RESULT_BACKEND", "cache+memory://")
+# Routes that go over their query_budget fail the test
+os.environ.setdefault("QUERY_BUDGET_STRICT", "true")
+# Every test client shares one address; rate limit tests enable them explicitly
+os.environ.setdefault("LOGIN_RATE_LIMIT_IP", "")
+os.environ.setdefault("LOGIN_RATE_LIMIT_ACCOUNT", "")
+os.environ.setdefault("SIGNUP_RATE_LIMIT_IP", "")
+# The test database is built from the models below, not by alembic
+os.environ.setdefault("SCHEMA_CHECK", "off")
+os.environ.setdefault("STARTUP_WARM_UP", "false")
+
+from typing import Callable
+from uuid import uuid4
+
 import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
 
+from src.core.database import create_db_and_tables, engine
 from src.core.load_fixtures import load_fixtures
+from src.main import app
+from src.modules.users.enums import RoleEnum
+from src.modules.users.models.users import User
+
+
+PASSWORD = "secret123!"
 
 
 @pytest.fixture(scope="session", autouse=True)
 def _load_permissions_fixtures():
+    create_db_and_tables()
     load_fixtures()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def signup(client: TestClient) -> Callable[..., dict]:
+    """``signup(email)`` creates a user (a random email by default) and returns it."""
+
+    def signup(email: str | None = None) -> dict:
+        email = email or f"test-{uuid4()}@example.com"
+        response = client.post("/v1/auth/signup", json={"email": email, "password": PASSWORD})
+        assert response.status_code == 200
+        return response.json()
+
+    return signup
+
+
+@pytest.fixture
+def authorize(client: TestClient, signup) -> Callable[..., dict[str, str]]:
+    """``authorize(role)`` signs up a fresh user with ``role`` and returns its auth headers."""
+
+    def authorize(role: RoleEnum = RoleEnum.user) -> dict[str, str]:
+        email = signup()["email"]
+
+        if role != RoleEnum.user:
+            with Session(engine) as session:
+                user = session.exec(select(User).where(User.email == email)).one()
+                user.roles = [role]
+                session.add(user)
+                session.commit()
+
+        login = client.post("/v1/auth/login", data={"username": email, "password": PASSWORD})
+        assert login.status_code == 200
+        return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    return authorize
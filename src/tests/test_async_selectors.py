@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import threading
+import time
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core import database
+from src.core.database import get_async_session, to_async_url
+from src.core.pool import engine_options
+from src.modules.users.enums import RoleEnum
+from src.modules.users.models.users import BulkUserValues, CreatePermission, Permission
+from src.modules.users.selectors import PermissionSelector, UserSelector
+from src.settings import settings
+
+
+async def _with_async_engine(test, monkeypatch):
+    """Run ``test`` with sessions from ``get_async_session`` on an asyncpg engine."""
+
+    engine = create_async_engine(
+        to_async_url(settings.database_url), **engine_options(async_driver=True)
+    )
+    monkeypatch.setattr(database, "async_engine", engine)
+    try:
+        async for session in get_async_session():
+            assert isinstance(session, AsyncSession)
+            await test(session)
+    finally:
+        await engine.dispose()
+
+
+def test_async_selectors_create_get_and_page(monkeypatch):
+    async def test(session: AsyncSession):
+        created = await PermissionSelector.acreate(
+            CreatePermission(name=f"test-{uuid4()}"), session
+        )
+        assert isinstance(created, Permission)
+
+        fetched = await PermissionSelector.aget(created.id, session)
+        assert fetched.name == created.name
+
+        page = await PermissionSelector.aall_page(session, None, 1)
+        assert len(page.items) == 1
+        assert page.next_cursor
+
+        user = await UserSelector.acreate(
+            {"email": f"test-{uuid4()}@example.com", "password": "secret123!"}, session
+        )
+        assert (await UserSelector.aget(user.id, session)).email == user.email
+
+        await PermissionSelector.adelete(created.id, session)
+        with pytest.raises(HTTPException):
+            await PermissionSelector.aget(created.id, session)
+
+    asyncio.run(_with_async_engine(test, monkeypatch))
+
+
+def test_async_session_requires_async_mode(monkeypatch):
+    monkeypatch.setattr(database, "async_engine", None)
+
+    async def first_session():
+        async for session in get_async_session():
+            return session
+
+    with pytest.raises(RuntimeError, match="DATABASE_ASYNC"):
+        asyncio.run(first_session())
+
+
+def test_async_writes_wait_for_deferred_hooks(monkeypatch):
+    forgotten = []
+
+    def forget(id):
+        # Deferred off the event loop thread, but done before aupdate returns
+        assert threading.current_thread() is not threading.main_thread()
+        time.sleep(0.1)
+        forgotten.append(id)
+
+    monkeypatch.setattr(UserSelector, "forget", forget)
+
+    async def test(session: AsyncSession):
+        user = await UserSelector.acreate(
+            {"email": f"test-{uuid4()}@example.com", "password": "secret123!"}, session
+        )
+        await UserSelector.aupdate(user.id, BulkUserValues(roles=[RoleEnum.admin]), session)
+        assert forgotten == [user.id]
+
+    asyncio.run(_with_async_engine(test, monkeypatch))
+
+
+def test_failing_deferred_hooks_are_logged(monkeypatch, caplog):
+    def fail():
+        raise RuntimeError("redis went away")
+
+    monkeypatch.setattr(database.logger, "propagate", True)
+
+    async def test(session: AsyncSession):
+        database.call_blocking(session.sync_session, fail)
+        await database.acommit(session)
+
+    with caplog.at_level(logging.ERROR, logger=database.logger.name):
+        asyncio.run(_with_async_engine(test, monkeypatch))
+
+    assert "Deferred commit hook failed" in caplog.text
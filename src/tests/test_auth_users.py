@@ -1,9 +1,9 @@
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
-from src.core.authentication import verify_password
+from src.core.authentication import user_cache, verify_password
 from src.core.database import engine
 from src.main import app
 from src.modules.users.enums import RoleEnum
@@ -160,3 +160,113 @@ def test_superadmin_can_delete_user():
         )
         assert response.status_code == 200
         assert response.json() == {"ok": True}
+
+
+def test_superadmin_can_page_users_with_cursor():
+    email = f"test-{uuid4()}@example.com"
+    password = "secret123!"
+
+    with TestClient(app) as client:
+        for _ in range(3):
+            assert _signup(client, f"test-{uuid4()}@example.com", password).status_code == 200
+        assert _signup(client, email, password).status_code == 200
+
+        _set_role(email, RoleEnum.superadmin)
+        headers = {"Authorization": f"Bearer {_token(client, email, password)}"}
+
+        first = client.get("/v1/users/", params={"cursor": "", "limit": 2}, headers=headers)
+        assert first.status_code == 200
+        assert len(first.json()) == 2
+        cursor = first.headers["X-Next-Cursor"]
+
+        second = client.get("/v1/users/", params={"cursor": cursor, "limit": 2}, headers=headers)
+        assert second.status_code == 200
+        first_ids = {user["id"] for user in first.json()}
+        assert first_ids.isdisjoint(user["id"] for user in second.json())
+
+        invalid = client.get("/v1/users/", params={"cursor": "???"}, headers=headers)
+        assert invalid.status_code == 400
+
+
+def test_superadmin_bulk_create_disable_and_delete_users():
+    email = f"test-{uuid4()}@example.com"
+    password = "secret123!"
+    new_emails = [f"test-{uuid4()}@example.com" for _ in range(3)]
+
+    with TestClient(app) as client:
+        assert _signup(client, email, password).status_code == 200
+        _set_role(email, RoleEnum.superadmin)
+        headers = {"Authorization": f"Bearer {_token(client, email, password)}"}
+
+        created = client.post(
+            "/v1/users/bulk",
+            json={"users": [{"email": e, "password": password} for e in new_emails]},
+            headers=headers,
+        )
+        assert created.status_code == 200
+        ids = [user["id"] for user in created.json()]
+        assert len(ids) == 3
+
+        duplicate = client.post(
+            "/v1/users/bulk",
+            json={"users": [{"email": new_emails[0], "password": password}]},
+            headers=headers,
+        )
+        assert duplicate.status_code == 200
+        assert duplicate.json() == []
+
+        assert _token(client, new_emails[0], password)
+
+        disabled = client.patch(
+            "/v1/users/bulk",
+            json={"ids": ids, "values": {"disabled": True}},
+            headers=headers,
+        )
+        assert disabled.json() == {"count": 3}
+
+        deleted = client.request(
+            "DELETE", "/v1/users/bulk", json={"ids": ids}, headers=headers
+        )
+        assert deleted.json() == {"count": 3}
+
+        unfiltered = client.request("DELETE", "/v1/users/bulk", json={}, headers=headers)
+        assert unfiltered.status_code == 400
+
+
+def test_bulk_users_requires_superadmin():
+    email = f"test-{uuid4()}@example.com"
+    password = "secret123!"
+
+    with TestClient(app) as client:
+        assert _signup(client, email, password).status_code == 200
+        token = _token(client, email, password)
+        response = client.post(
+            "/v1/users/bulk",
+            json={"users": []},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 403
+
+
+def test_user_cache_keeps_no_password_hash(client, authorize):
+    headers = authorize()
+
+    me = client.get("/v1/users/me/", headers=headers)
+    assert me.status_code == 200
+    assert me.json()["password"] == ""
+
+    snapshot = user_cache.get(UUID(me.json()["id"]))
+    assert snapshot is not None
+    assert "password" not in snapshot
+
+
+def test_bulk_filter_value_must_match_the_field(client, authorize):
+    headers = authorize(RoleEnum.superadmin)
+
+    for filter in (
+        {"field": "disabled", "value": "user"},
+        {"field": "roles", "value": True},
+        {"field": "roles"},
+    ):
+        response = client.request("DELETE", "/v1/users/bulk", json=filter, headers=headers)
+        assert response.status_code == 422, filter
@@ -0,0 +1,38 @@
+from collections import Counter
+
+from src.benchmarks.__main__ import flatten
+from src.benchmarks.endpoints import rate_limits_off
+from src.benchmarks.stats import percentile, summarize
+from src.modules.auth.routes import auth
+
+
+def test_summarize_reports_percentiles_in_milliseconds():
+    latencies = [i / 1000 for i in range(1, 101)]
+
+    summary = summarize(latencies, elapsed=2.0, statuses=Counter({200: 99, 503: 1}))
+
+    assert summary["count"] == 100
+    assert summary["throughput_per_s"] == 50.0
+    assert summary["p50_ms"] == 50.0
+    assert summary["p99_ms"] == 99.0
+    assert summary["max_ms"] == 100.0
+    assert summary["statuses"] == {"200": 99, "503": 1}
+    assert percentile([], 99) == 0.0
+
+
+def test_flatten_keeps_numeric_metrics_only():
+    results = {
+        "meta": {"commit": "abc", "users": 10},
+        "endpoints": {"me": {"p50_ms": 1.5, "statuses": {"200": 3}}},
+        "micro": {"files": {"s3": "skipped, moto is not installed"}},
+    }
+
+    assert flatten(results) == {"endpoints.me.p50_ms": 1.5}
+
+
+def test_endpoint_benchmarks_run_without_auth_rate_limits():
+    limit = auth.login_ip_limit
+    with rate_limits_off():
+        assert not auth.login_ip_limit.enabled
+        assert not auth.signup_ip_limit.enabled
+    assert auth.login_ip_limit is limit
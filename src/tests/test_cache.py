@@ -0,0 +1,52 @@
+import time
+
+from src.core.cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_and_invalidates():
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_disabled_with_zero_ttl():
+    cache = TTLCache(maxsize=10, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_etag_comparison_is_weak_and_accepts_lists():
+    from starlette.requests import Request
+
+    from src.core.http_cache import etag_matches, make_etag
+
+    def request(if_none_match: str) -> Request:
+        headers = [(b"if-none-match", if_none_match.encode())]
+        return Request({"type": "http", "method": "GET", "headers": headers})
+
+    etag = make_etag(b'[{"id": 1}]')
+    assert etag == make_etag(b'[{"id": 1}]')
+    assert etag != make_etag(b'[{"id": 2}]')
+
+    assert etag_matches(request(etag), etag)
+    assert etag_matches(request(f'"other", W/{etag}'), etag)
+    assert etag_matches(request("*"), etag)
+    assert not etag_matches(request('"other"'), etag)
@@ -0,0 +1,67 @@
+import asyncio
+from uuid import UUID
+
+import jwt
+import pytest
+from sqlmodel import Session, select
+
+from src.core import authentication
+from src.core.database import engine
+from src.modules.users.enums import RoleEnum
+from src.modules.users.models.users import BulkUserValues, User
+from src.modules.users.selectors import UserSelector
+from src.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def claims(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeRedis()
+    monkeypatch.setattr(authentication, "get_redis", lambda: redis)
+    monkeypatch.setattr(settings, "jwt_embed_claims", True)
+    return redis
+
+
+def _user_id(headers: dict[str, str]) -> UUID:
+    token = headers["Authorization"].removeprefix("Bearer ")
+    payload = jwt.decode(token, authentication.SECRET_KEY, algorithms=[authentication.ALGORITHM])
+    return UUID(payload["sub"])
+
+
+def test_claims_token_authorizes_without_user_lookup(monkeypatch, client, authorize):
+    headers = authorize(RoleEnum.superadmin)
+    token = headers["Authorization"].removeprefix("Bearer ")
+    payload = jwt.decode(token, authentication.SECRET_KEY, algorithms=[authentication.ALGORITHM])
+    assert payload["roles"] == ["superadmin"]
+    # Bumped once by the role change before login
+    assert payload["ver"] == "0.1"
+
+    async def _no_lookup(user_id, session):
+        raise AssertionError("user should not be loaded")
+
+    monkeypatch.setattr(authentication, "load_user", _no_lookup)
+    assert client.get("/v1/users/", headers=headers).status_code == 200
+
+
+def test_claims_token_falls_back_to_db_after_selector_update(client, authorize):
+    headers = authorize(RoleEnum.superadmin)
+
+    with Session(engine) as session:
+        asyncio.run(UserSelector.aupdate(
+            _user_id(headers), BulkUserValues(roles=[RoleEnum.user]), session
+        ))
+
+    assert client.get("/v1/users/", headers=headers).status_code == 403
+
+
+def test_claims_token_falls_back_to_db_after_any_orm_write(client, authorize):
+    headers = authorize(RoleEnum.superadmin)
+
+    # Not through UserSelector, like scripts and admin tools write
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.id == _user_id(headers))).one()
+        user.roles = [RoleEnum.user]
+        session.add(user)
+        session.commit()
+
+    assert client.get("/v1/users/", headers=headers).status_code == 403
@@ -0,0 +1,353 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import boto3
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from src.core import files
+from src.core.files import S3File, StaticFile, UploadValidator
+from src.settings import Settings
+
+
+PART_SIZE = 5 * 1024 * 1024
+OWNER = "8d7f5c1e-0000-4000-8000-000000000001"
+
+
+async def _chunks(data: bytes, size: int = 64 * 1024):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _failing_chunks(data: bytes):
+    async for chunk in _chunks(data):
+        yield chunk
+    raise RuntimeError("client went away")
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    moto = pytest.importorskip("moto")
+
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=S3File.bucket)
+        monkeypatch.setattr(S3File, "s3", client)
+        monkeypatch.setattr(S3File, "part_size", PART_SIZE)
+        yield client
+
+
+def _key(url: str) -> str:
+    return url[len(S3File.base_url) + 1:]
+
+
+def test_s3_multipart_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("S3_PART_SIZE", str(16 * 1024 * 1024))
+    monkeypatch.setenv("S3_PART_CONCURRENCY", "8")
+
+    conf = Settings().s3_conf
+
+    assert conf.part_size == 16 * 1024 * 1024
+    assert conf.part_concurrency == 8
+
+
+def test_upload_route_streams_the_body_to_s3(s3, monkeypatch, client, authorize):
+    monkeypatch.setattr("src.modules.files.routes.files.file_manager", S3File)
+    body = os.urandom(PART_SIZE + 1024)
+
+    response = client.post(
+        "/v1/files", content=body, headers={**authorize(), "Content-Type": "application/pdf"}
+    )
+
+    assert response.status_code == 200
+    stored = response.json()
+    assert stored["url"] == f"{S3File.base_url}/{stored['key']}"
+    assert stored["size"] == len(body)
+    assert s3.get_object(Bucket=S3File.bucket, Key=stored["key"])["Body"].read() == body
+
+
+def test_s3_save_stream_uses_multipart_for_large_bodies(s3):
+    data = bytes(range(256)) * (PART_SIZE * 2 // 256 + 100)
+
+    url = asyncio.run(S3File.save_stream(_chunks(data), "application/pdf"))
+
+    body = s3.get_object(Bucket=S3File.bucket, Key=_key(url))["Body"].read()
+    assert body == data
+    assert s3.list_multipart_uploads(Bucket=S3File.bucket).get("Uploads", []) == []
+
+
+def test_s3_save_stream_puts_small_bodies_in_one_request(s3):
+    url = asyncio.run(S3File.save_stream(_chunks(b"hello"), "text/plain"))
+
+    assert _key(url).startswith(f"{S3File.prefix}/")
+    assert s3.get_object(Bucket=S3File.bucket, Key=_key(url))["Body"].read() == b"hello"
+
+
+def test_s3_save_stream_aborts_multipart_on_failure(s3):
+    data = b"x" * (PART_SIZE * 2)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(S3File.save_stream(_failing_chunks(data), "application/pdf"))
+
+    assert s3.list_multipart_uploads(Bucket=S3File.bucket).get("Uploads", []) == []
+
+
+def _upload(content: bytes, filename: str = "doc.pdf") -> UploadFile:
+    return UploadFile(io.BytesIO(content), filename=filename)
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    """Served directory of ``StaticFile``; its state goes to ``tmp_path / "state"``."""
+
+    monkeypatch.setattr(StaticFile, "base_dir", str(tmp_path / "static"))
+    monkeypatch.setattr(StaticFile, "state_dir", str(tmp_path / "state"))
+    return tmp_path / "static"
+
+
+def _served_files(static_dir) -> list[str]:
+    return [
+        os.path.relpath(os.path.join(root, name), static_dir)
+        for root, _, names in os.walk(static_dir)
+        for name in names
+    ]
+
+
+def test_static_content_addressed_dedupes_and_counts_references(static_dir, monkeypatch):
+    monkeypatch.setattr(StaticFile, "content_addressed", True)
+
+    first = asyncio.run(StaticFile(_upload(b"same bytes")).save())
+    second = asyncio.run(StaticFile(_upload(b"same bytes")).save())
+    other = asyncio.run(StaticFile(_upload(b"other bytes")).save())
+
+    assert first == second != other
+    relative = first[len(StaticFile.base_url) + 1:]
+    digest = os.path.splitext(os.path.basename(relative))[0]
+    assert relative == f"{digest[:2]}/{digest[2:4]}/{digest}.pdf"
+    path = static_dir / relative
+    assert path.read_bytes() == b"same bytes"
+    # Sidecars and temp files are not under the served directory
+    assert sorted(_served_files(static_dir)) == sorted([relative, other[len(StaticFile.base_url) + 1:]])
+    assert os.listdir(static_dir.parent / "state" / "tmp") == []
+
+    asyncio.run(StaticFile(_upload(b"")).delete(first))
+    assert path.exists()
+
+    asyncio.run(StaticFile(_upload(b"")).delete(second))
+    assert not path.exists()
+
+
+def test_upload_validator_rejects_oversized_stream_early():
+    validator = UploadValidator(None, max_size=10)
+    validator.feed(b"12345")
+
+    with pytest.raises(HTTPException) as exc:
+        validator.feed(b"678901")
+    assert exc.value.status_code == 413
+
+
+def test_upload_validator_sniffs_type_from_first_chunk():
+    validator = UploadValidator(["application/pdf"], max_size=None, content_type="image/png")
+
+    with pytest.raises(HTTPException) as exc:
+        validator.feed(b"plain text, not a pdf" * 200)
+    assert exc.value.status_code == 400
+
+    validator = UploadValidator(["application/pdf"], max_size=None, content_type="image/png")
+    validator.feed(b"%PDF-1.4\n")
+    validator.finish()
+
+
+def test_static_save_records_checksum_and_leaves_no_partial_file(static_dir, monkeypatch):
+    monkeypatch.setattr(StaticFile, "max_size", 4)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(StaticFile(_upload(b"too large")).save())
+    assert os.listdir(static_dir.parent / "state" / "tmp") == []
+
+    static = StaticFile(_upload(b"ok"))
+    asyncio.run(static.save())
+    assert static.checksum == hashlib.sha256(b"ok").hexdigest()
+
+
+def test_s3_presigned_upload_and_complete(s3):
+    presigned = asyncio.run(S3File.presign_upload("application/pdf", OWNER, "report.pdf"))
+    assert presigned.method == "POST"
+    assert presigned.key.startswith(f"{S3File.prefix}/{OWNER}/")
+    assert presigned.key.endswith(".pdf")
+    assert presigned.fields["key"] == presigned.key
+
+    # What the client does with the presigned POST
+    s3.put_object(
+        Bucket=S3File.bucket,
+        Key=presigned.key,
+        Body=b"%PDF-1.4\n",
+        ContentType="application/pdf",
+    )
+
+    # Someone else's key is refused before S3 is touched
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(S3File.complete_upload(presigned.key, "someone-else"))
+    assert exc.value.status_code == 403
+
+    stored = asyncio.run(S3File.complete_upload(presigned.key, OWNER))
+    assert stored.size == 9
+    assert stored.url == f"{S3File.base_url}/{presigned.key}"
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(S3File.complete_upload(f"{S3File.prefix}/{OWNER}/missing.pdf", OWNER))
+    assert exc.value.status_code == 404
+
+
+def test_s3_complete_upload_deletes_oversized_objects(s3, monkeypatch):
+    monkeypatch.setattr(S3File, "max_size", 4)
+    key = f"{S3File.prefix}/{OWNER}/big.bin"
+    s3.put_object(Bucket=S3File.bucket, Key=key, Body=b"too large")
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(S3File.complete_upload(key, OWNER))
+
+    assert exc.value.status_code == 413
+    assert s3.list_objects_v2(Bucket=S3File.bucket).get("KeyCount") == 0
+
+
+@pytest.fixture
+def local_files(static_dir, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeRedis()
+    monkeypatch.setattr(files, "get_redis", lambda: redis)
+    return static_dir
+
+
+def _presign(client, headers, filename="notes.txt"):
+    presigned = client.post(
+        "/v1/files/uploads",
+        json={"content_type": "text/plain", "filename": filename},
+        headers=headers,
+    )
+    assert presigned.status_code == 200
+    return presigned.json()
+
+
+def test_local_presigned_upload_flow(local_files, client, authorize):
+    headers = authorize()
+    upload = _presign(client, headers)
+    assert upload["method"] == "PUT"
+
+    put = client.put(upload["url"], content=b"hello", headers=upload["headers"])
+    assert put.status_code == 200
+    assert put.json() == {"key": upload["key"]}
+
+    tampered = client.put(upload["url"] + "x", content=b"hello")
+    assert tampered.status_code == 403
+
+    complete = client.post(
+        "/v1/files/uploads/complete", json={"key": upload["key"]}, headers=headers
+    )
+    assert complete.status_code == 200
+    assert complete.json()["size"] == 5
+    assert (local_files / upload["key"]).read_bytes() == b"hello"
+
+
+def test_local_upload_url_works_once(local_files, client, authorize):
+    upload = _presign(client, authorize())
+
+    assert client.put(upload["url"], content=b"hello", headers=upload["headers"]).status_code == 200
+    reused = client.put(upload["url"], content=b"evil", headers=upload["headers"])
+
+    assert reused.status_code == 403
+    assert (local_files / upload["key"]).read_bytes() == b"hello"
+
+
+def test_uploads_belong_to_the_user_who_presigned_them(local_files, client, authorize):
+    owner, other = authorize(), authorize()
+    upload = _presign(client, owner)
+    assert client.put(upload["url"], content=b"hello", headers=upload["headers"]).status_code == 200
+
+    complete = client.post(
+        "/v1/files/uploads/complete", json={"key": upload["key"]}, headers=other
+    )
+    assert complete.status_code == 403
+    download = client.get("/v1/files/downloads", params={"key": upload["key"]}, headers=other)
+    assert download.status_code == 403
+    assert (local_files / upload["key"]).exists()
+
+    download = client.get("/v1/files/downloads", params={"key": upload["key"]}, headers=owner)
+    assert download.status_code == 200
+
+
+def test_local_presigned_uploads_are_content_addressed(local_files, monkeypatch, client, authorize):
+    monkeypatch.setattr(StaticFile, "content_addressed", True)
+    headers = authorize()
+
+    keys = []
+    for _ in range(2):
+        upload = _presign(client, headers)
+        assert client.put(upload["url"], content=b"same", headers=upload["headers"]).status_code == 200
+        keys.append(upload["key"])
+
+    digest = hashlib.sha256(b"same").hexdigest()
+    blob = local_files / digest[:2] / digest[2:4] / f"{digest}.txt"
+    assert blob.read_bytes() == b"same"
+    assert all(os.path.realpath(local_files / key) == str(blob) for key in keys)
+
+    asyncio.run(StaticFile(_upload(b"")).delete(keys[0]))
+    assert blob.exists()
+    asyncio.run(StaticFile(_upload(b"")).delete(keys[1]))
+    assert not blob.exists()
+    assert not any((local_files / key).is_symlink() for key in keys)
+
+
+def test_legacy_sidecars_next_to_files_are_moved_to_the_state_dir(static_dir, monkeypatch):
+    monkeypatch.setattr(StaticFile, "content_addressed", True)
+    url = asyncio.run(StaticFile(_upload(b"shared")).save())
+    path = static_dir / url[len(StaticFile.base_url) + 1:]
+
+    # As left by a version that kept sidecars in the served directory
+    refs_path = StaticFile._refs_path(str(path))
+    os.remove(refs_path)
+    legacy = path.with_name(f"{path.name}.refs")
+    legacy.write_text("2")
+
+    asyncio.run(StaticFile(_upload(b"")).delete(url))
+
+    assert path.exists()
+    assert not legacy.exists()
+    assert open(refs_path).read() == "1"
+
+
+def test_upload_route_streams_the_body_to_storage(static_dir, client, authorize):
+    response = client.post(
+        "/v1/files", content=b"hello", headers={**authorize(), "Content-Type": "text/plain"}
+    )
+
+    assert response.status_code == 200
+    stored = response.json()
+    assert stored["size"] == 5
+    assert stored["url"] == f"{StaticFile.base_url}/{stored['key']}"
+    assert (static_dir / stored["key"]).read_bytes() == b"hello"
+
+
+def test_upload_route_rejects_bad_uploads_without_storing_them(static_dir, monkeypatch, client, authorize):
+    headers = {**authorize(), "Content-Type": "text/plain"}
+    monkeypatch.setattr(StaticFile, "max_size", 8)
+
+    declared = client.post("/v1/files", content=b"x" * 9, headers=headers)
+
+    def undeclared():
+        yield b"x" * 8
+        yield b"x"
+
+    streamed = client.post("/v1/files", content=undeclared(), headers=headers)
+
+    monkeypatch.setattr(StaticFile, "max_size", None)
+    monkeypatch.setattr(StaticFile, "allowed_mimes", ["application/pdf"])
+    wrong_type = client.post("/v1/files", content=b"x" * 4096, headers=headers)
+
+    assert declared.status_code == 413
+    assert streamed.status_code == 413
+    assert wrong_type.status_code == 400
+    assert _served_files(static_dir) == []
+    assert os.listdir(StaticFile._tmp_dir()) == []
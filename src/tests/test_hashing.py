@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.core.hashing import PasswordHasher
+from src.settings import HashExecutorEnum, Settings
+
+
+def test_password_hasher_hashes_and_verifies_off_loop():
+    hasher = PasswordHasher(HashExecutorEnum.thread, workers=1, queue_size=1)
+
+    async def _run():
+        hashed = await hasher.hash("secret123!")
+        return hashed, await hasher.verify("secret123!", hashed)
+
+    try:
+        hashed, ok = asyncio.run(_run())
+    finally:
+        hasher.shutdown()
+
+    assert hashed != "secret123!"
+    assert ok
+
+
+def test_password_hasher_rejects_when_saturated():
+    hasher = PasswordHasher(HashExecutorEnum.thread, workers=1, queue_size=0)
+    hasher._pending = 1
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(hasher.hash("secret123!"))
+
+    assert exc.value.status_code == 503
+
+
+def test_hash_pool_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("PASSWORD_HASH_EXECUTOR", "thread")
+    monkeypatch.setenv("PASSWORD_HASH_WORKERS", "9")
+    monkeypatch.setenv("PASSWORD_HASH_QUEUE_SIZE", "3")
+
+    conf = Settings().password_hash_conf
+
+    assert (conf.executor, conf.workers, conf.queue_size) == (HashExecutorEnum.thread, 9, 3)
@@ -0,0 +1,77 @@
+import pytest
+
+from src.core import http_cache
+from src.modules.users.enums import RoleEnum
+from src.modules.users.selectors import UserSelector
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeRedis()
+    monkeypatch.setattr(http_cache, "get_redis", lambda: redis)
+    return redis
+
+
+def test_get_user_answers_if_none_match_until_the_user_changes(redis, client, authorize, signup):
+    headers = authorize(RoleEnum.superadmin)
+    target = signup()
+    url = f"/v1/users/{target['id']}"
+
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    etag = first.headers["ETag"]
+
+    cached = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    # POST stays available and never answers 304
+    assert client.post(url, headers={**headers, "If-None-Match": etag}).status_code == 200
+
+    updated = client.patch(
+        url, json={**target, "roles": [RoleEnum.admin.value]}, headers=headers
+    )
+    assert updated.status_code == 200
+
+    changed = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["roles"] == [RoleEnum.admin.value]
+
+
+def test_get_user_revalidates_without_loading_the_user(redis, monkeypatch, client, authorize, signup):
+    headers = authorize(RoleEnum.superadmin)
+    url = f"/v1/users/{signup()['id']}"
+    etag = client.get(url, headers=headers).headers["ETag"]
+
+    async def _no_lookup(id, session):
+        raise AssertionError("user should not be loaded")
+
+    monkeypatch.setattr(UserSelector, "aget", _no_lookup)
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_get_user_hashes_the_body_without_redis(client, authorize, signup):
+    headers = authorize(RoleEnum.superadmin)
+    url = f"/v1/users/{signup()['id']}"
+
+    etag = client.get(url, headers=headers).headers["ETag"]
+
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_entity_tags_change_per_row_and_for_the_whole_namespace(redis):
+    tags = http_cache.EntityTags("things")
+    first, second = tags.etag(1), tags.etag(2)
+    assert first != second
+    assert tags.etag(1) == first
+
+    tags.invalidate(1)
+    assert tags.etag(1) != first
+    assert tags.etag(2) == second
+
+    tags.invalidate()
+    assert tags.etag(2) != second
@@ -0,0 +1,71 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from src.core.authentication import user_by_email
+from src.core.database import engine
+from src.main import app
+from src.modules.users.enums import RoleEnum
+from src.modules.users.models.users import Permission
+from src.modules.users.selectors import PermissionSelector, UserSelector
+
+
+def _plan(statement) -> str:
+    """EXPLAIN ``statement`` with sequential scans priced out, as on a big table."""
+
+    with Session(engine) as session:
+        connection = session.connection()
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        compiled = statement.compile(dialect=connection.dialect)
+        rows = connection.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).all()
+        return "\n".join(row[0] for row in rows)
+
+
+def test_role_filter_uses_gin_index():
+    users = select(UserSelector.model).where(
+        UserSelector.filter_expression("roles", RoleEnum.superadmin)
+    )
+    assert "ix_user_roles" in _plan(users)
+
+    permissions = select(Permission).where(
+        PermissionSelector.filter_expression("roles", [RoleEnum.admin, RoleEnum.superadmin])
+    )
+    assert "ix_permission_roles" in _plan(permissions)
+
+
+def test_email_lookup_uses_lower_email_index():
+    assert "ux_user_email_lower" in _plan(user_by_email("Someone@Example.com"))
+
+
+def test_permission_name_lookup_uses_index():
+    statement = select(Permission).where(Permission.name == "get_user")
+    assert "ix_permission_name" in _plan(statement)
+
+
+def test_emails_are_unique_and_matched_regardless_of_case():
+    email = f"test-{uuid4()}@example.com"
+    password = "secret123!"
+
+    with TestClient(app) as client:
+        signup = client.post("/v1/auth/signup", json={"email": email, "password": password})
+        assert signup.status_code == 200
+
+        duplicate = client.post(
+            "/v1/auth/signup", json={"email": email.upper(), "password": password}
+        )
+        assert duplicate.status_code == 403
+
+        login = client.post(
+            "/v1/auth/login", data={"username": email.upper(), "password": password}
+        )
+        assert login.status_code == 200
+
+
+def test_role_filter_returns_matching_rows():
+    with Session(engine) as session:
+        permissions = PermissionSelector.filter(session, "roles", RoleEnum.superadmin)
+
+    assert permissions
+    assert all(RoleEnum.superadmin in permission.roles for permission in permissions)
@@ -0,0 +1,84 @@
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+from sqlmodel import Session, select
+
+from src.core import jobs
+from src.core.celery import celery_app
+from src.core.database import engine
+from src.core.jobs import enqueue
+from src.modules.users.enums import RoleEnum
+from src.modules.users.models.users import User
+from src.settings import logger
+from src.tasks.tasks import dummy_task
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeRedis()
+    monkeypatch.setattr(jobs, "get_redis", lambda: redis)
+    return redis
+
+
+def test_superadmin_bulk_disable_runs_as_job(client, authorize, signup):
+    headers = authorize(RoleEnum.superadmin)
+    targets = [signup()["id"] for _ in range(2)]
+
+    queued = client.post("/v1/users/bulk/disable", json={"ids": targets}, headers=headers)
+    assert queued.status_code == 202
+    assert queued.headers["Location"] == queued.json()["status_url"]
+
+    job = client.get(queued.json()["status_url"], headers=headers)
+    assert job.status_code == 200
+    assert job.json()["state"] == "SUCCESS"
+    assert job.json()["result"] == [2]
+
+    with Session(engine) as session:
+        users = session.exec(select(User).where(User.id.in_([UUID(id) for id in targets]))).all()
+        assert len(users) == 2
+        assert all(user.disabled for user in users)
+
+
+def test_jobs_are_visible_to_their_owner_and_superadmins(client, authorize):
+    owner, other, admin = authorize(), authorize(), authorize(RoleEnum.superadmin)
+    owner_id = client.get("/v1/users/me/", headers=owner).json()["id"]
+
+    queued = asyncio.run(enqueue(dummy_task, owner=owner_id))
+    status_url = queued.headers["Location"]
+
+    assert client.get(status_url, headers=owner).json()["state"] == "SUCCESS"
+    assert client.get(status_url, headers=admin).status_code == 200
+    assert client.get(status_url, headers=other).status_code == 404
+    assert client.get(f"/v1/jobs/{uuid4()}", headers=owner).status_code == 404
+    assert client.get(f"/v1/jobs/{uuid4()}", headers=admin).json()["state"] == "PENDING"
+
+
+def test_enqueue_publishes_off_the_event_loop(monkeypatch):
+    published = []
+
+    def apply_async(args, kwargs, task_id):
+        # Raises when called on the event loop thread
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        published.append(task_id)
+
+    monkeypatch.setattr(dummy_task, "apply_async", apply_async)
+
+    queued = asyncio.run(enqueue(dummy_task, owner="someone"))
+
+    assert published == [queued.headers["Location"].rsplit("/", 1)[1]]
+    assert jobs.job_owner(published[0]) == "someone"
+
+
+def test_failed_jobs_report_the_error_type_only(caplog):
+    job_id = str(uuid4())
+    celery_app.backend.mark_as_failure(job_id, RuntimeError("SELECT password FROM user"))
+
+    with caplog.at_level("ERROR", logger=logger.name):
+        job = jobs.job_status(job_id)
+
+    assert job.state == "FAILURE"
+    assert job.error == "RuntimeError"
+    assert "SELECT password" in caplog.text
@@ -0,0 +1,139 @@
+import asyncio
+import socket
+
+import pytest
+
+from src.core.mail import QueuedEmail, SMTPConnectionPool, build_message
+from src.settings import MailBackendEnum, MailConfig, Settings
+
+
+@pytest.fixture
+def smtp_server():
+    aiosmtpd = pytest.importorskip("aiosmtpd.controller")
+
+    class Handler:
+        def __init__(self):
+            self.messages = []
+            self.sessions = set()
+
+        async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+            if address.startswith("bounce"):
+                return "550 No such user"
+            if address.startswith("busy"):
+                return "450 Mailbox busy"
+            envelope.rcpt_tos.append(address)
+            return "250 OK"
+
+        async def handle_DATA(self, server, session, envelope):
+            self.messages.append(envelope)
+            self.sessions.add(id(session))
+            return "250 OK"
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    handler = Handler()
+    controller = aiosmtpd.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        yield controller, handler
+    finally:
+        controller.stop()
+
+
+def _pool(controller) -> SMTPConnectionPool:
+    return SMTPConnectionPool(
+        MailConfig(
+            MAIL_SERVER=controller.hostname,
+            MAIL_PORT=controller.port,
+            MAIL_SSL_TLS=False,
+            MAIL_STARTTLS=False,
+            MAIL_USE_CREDENTIALS=False,
+            MAIL_POOL_SIZE=1,
+        )
+    )
+
+
+def test_pool_reuses_connections_across_messages(smtp_server):
+    controller, handler = smtp_server
+    pool = _pool(controller)
+
+    async def _send():
+        for i in range(3):
+            await pool.send_messages([build_message(f"hello {i}", ["to@example.com"], "<b>hi</b>")])
+        batch = [build_message("batch", ["to@example.com"], "hi") for _ in range(2)]
+        await pool.send_messages(batch)
+        assert batch == []
+        await pool.close()
+
+    asyncio.run(_send())
+
+    assert len(handler.messages) == 5
+    assert len(handler.sessions) == 1
+
+
+def test_mail_backend_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv("MAIL_BACKEND", "queued")
+    monkeypatch.setenv("MAIL_BATCH_SIZE", "2")
+
+    conf = Settings().mail_conf
+
+    assert conf.backend == MailBackendEnum.queued
+    assert conf.batch_size == 2
+
+
+def test_queued_email_publishes_off_the_event_loop(monkeypatch):
+    from src.tasks import tasks
+
+    batches = []
+
+    def delay(payload):
+        # Raises when called on the event loop thread
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        batches.append(payload)
+
+    monkeypatch.setattr(tasks.send_emails, "delay", delay)
+
+    asyncio.run(QueuedEmail.send_many([("hi", ["to@example.com"], "body")]))
+
+    assert batches == [[["hi", ["to@example.com"], "body"]]]
+
+
+def test_send_emails_skips_permanently_rejected_messages(smtp_server, monkeypatch):
+    from src.tasks import tasks
+
+    controller, handler = smtp_server
+    monkeypatch.setattr(tasks, "smtp_pool", _pool(controller))
+
+    result = tasks.send_emails.apply(args=[[
+        ["one", ["to@example.com"], "hi"],
+        ["two", ["bounce@example.com"], "hi"],
+        ["three", ["to@example.com"], "hi"],
+    ]])
+
+    assert result.successful()
+    assert len(handler.messages) == 2
+
+
+def test_pool_keeps_temporarily_rejected_messages_for_a_retry(smtp_server):
+    aiosmtplib = pytest.importorskip("aiosmtplib")
+    controller, handler = smtp_server
+    pool = _pool(controller)
+    batch = [
+        build_message("busy", ["busy@example.com"], "hi"),
+        build_message("later", ["to@example.com"], "hi"),
+    ]
+
+    async def _send():
+        try:
+            await pool.send_messages(batch, skip_rejected=True)
+        finally:
+            await pool.close()
+
+    with pytest.raises(aiosmtplib.SMTPRecipientsRefused):
+        asyncio.run(_send())
+
+    assert [message["Subject"] for message in batch] == ["busy", "later"]
+    assert handler.messages == []
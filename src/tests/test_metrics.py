@@ -0,0 +1,70 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+
+from src.core.metrics import MetricsMiddleware
+from src.settings import EnvironmentEnum, settings
+
+
+def test_metrics_endpoint_reports_route_latency_and_queries(client, authorize):
+    assert client.get("/v1/users/me/", headers=authorize()).status_code == 200
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+
+    body = metrics.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/v1/auth/signup",status="200"}' in body
+    assert 'http_request_db_queries_count{method="POST",route="/v1/auth/signup"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/v1/users/me/",status="200"}' in body
+    assert 'route="/metrics"' not in body
+    assert "threadpool_waiting_tasks" in body
+    assert "db_pool_checked_out" in body
+
+
+class _Ignored:
+    def observe(self, value: float) -> None:
+        pass
+
+
+def test_route_label_keeps_router_prefixes_and_path_params(monkeypatch):
+    routes = []
+    monkeypatch.setattr(
+        "src.core.metrics.REQUEST_LATENCY.labels",
+        lambda method, route, status: routes.append(route) or _Ignored(),
+    )
+
+    inner = APIRouter(prefix="/items")
+
+    @inner.get("/{id}")
+    def get_item(id: int):
+        return {"id": id}
+
+    outer = APIRouter()
+    outer.include_router(inner)
+    app = FastAPI()
+    app.include_router(outer, prefix="/v2")
+    app.add_middleware(MetricsMiddleware)
+
+    with TestClient(app) as client:
+        assert client.get("/v2/items/7").status_code == 200
+        assert client.get("/v2/missing").status_code == 404
+
+    assert routes == ["/v2/items/{id}", "unmatched"]
+
+
+def test_metrics_require_the_token(monkeypatch, client):
+    monkeypatch.setattr(settings, "metrics_token", SecretStr("scrape-me"))
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-me"}).status_code == 200
+
+
+def test_metrics_are_closed_in_prod_without_a_token(monkeypatch, client):
+    monkeypatch.setattr(settings, "environment", EnvironmentEnum.prod)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
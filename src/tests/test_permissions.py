@@ -0,0 +1,64 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core import permissions
+from src.core.database import to_async_url
+from src.core.permissions import PermissionCache
+from src.modules.users.enums import RoleEnum
+from src.modules.users.models.users import Permission
+from src.settings import settings
+
+
+def test_permission_cache_maps_roles_to_route_names():
+    cache = PermissionCache(refresh_seconds=60)
+    cache.load()
+
+    assert cache.has_permission([RoleEnum.superadmin], "read_users")
+    assert cache.has_permission(["user"], "read_users_me")
+    assert not cache.has_permission([RoleEnum.user], "read_users")
+    assert not cache.has_permission([], "read_users_me")
+
+
+def test_permission_cache_reloads_after_invalidate():
+    cache = PermissionCache(refresh_seconds=60)
+    cache.load()
+    assert not cache.is_stale
+
+    cache.invalidate()
+    assert cache.is_stale
+
+    cache.refresh()
+    assert not cache.is_stale
+    assert cache.has_permission([RoleEnum.superadmin], "delete_user")
+
+
+def test_async_permission_writes_bump_the_version_off_the_event_loop(monkeypatch):
+    bumps = []
+
+    def invalidate():
+        # Raises when called on the event loop thread
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        bumps.append(True)
+
+    monkeypatch.setattr(permissions.permission_cache, "invalidate", invalidate)
+
+    async def write():
+        engine = create_async_engine(to_async_url(settings.database_url))
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                permission = Permission(name=f"test-{uuid4()}")
+                session.add(permission)
+                await session.commit()
+                await session.delete(permission)
+                await session.commit()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(write())
+
+    assert bumps == [True, True]
@@ -0,0 +1,33 @@
+from src.core.pool import InstrumentedQueuePool, engine_options
+from src.modules.users.enums import RoleEnum
+from src.settings import Settings
+
+
+def test_pool_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "42")
+    monkeypatch.setenv("DB_POOL_MAX_OVERFLOW", "3")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "1500")
+    monkeypatch.setattr("src.core.pool.settings", Settings())
+
+    options = engine_options()
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 42
+    assert options["max_overflow"] == 3
+    assert options["connect_args"] == {"options": "-c statement_timeout=1500"}
+    assert engine_options(async_driver=True)["connect_args"] == {
+        "server_settings": {"statement_timeout": "1500"}
+    }
+
+
+def test_superadmin_can_read_pool_stats(client, authorize):
+    response = client.get("/v1/internal/pool", headers=authorize(RoleEnum.superadmin))
+
+    assert response.status_code == 200
+    primary = response.json()["primary"]
+    assert primary["checkouts"] > 0
+    assert {"size", "checked_out", "overflow", "timeouts"} <= primary.keys()
+
+
+def test_pool_stats_require_superadmin(client, authorize):
+    assert client.get("/v1/internal/pool", headers=authorize()).status_code == 403
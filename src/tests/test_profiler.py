@@ -0,0 +1,63 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session
+
+from src.core.database import engine
+from src.core.profiler import (
+    QueryBudgetExceeded,
+    QueryProfile,
+    QueryProfilerMiddleware,
+    query_budget,
+)
+
+
+def test_profile_counts_duplicate_statements():
+    profile = QueryProfile()
+    profile.record("SELECT 1", 0.001)
+    for _ in range(3):
+        profile.record("SELECT * FROM permission WHERE id = %(id)s", 0.002)
+
+    assert profile.queries == 4
+    assert profile.duplicates == 2
+    assert profile.most_repeated() == ("SELECT * FROM permission WHERE id = %(id)s", 3)
+    assert profile.server_timing().startswith('db;dur=7.0;desc="4 queries"')
+
+
+def profiled_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryProfilerMiddleware)
+
+    @app.get("/within")
+    @query_budget(2)
+    def within():
+        with Session(engine) as session:
+            session.connection().execute(text("SELECT 1"))
+            session.connection().execute(text("SELECT 1"))
+        return {}
+
+    @app.get("/over")
+    @query_budget(1)
+    def over():
+        with Session(engine) as session:
+            session.connection().execute(text("SELECT 1"))
+            session.connection().execute(text("SELECT 1"))
+        return {}
+
+    return app
+
+
+def test_server_timing_reports_request_queries():
+    with TestClient(profiled_app()) as client:
+        response = client.get("/within")
+
+    assert response.status_code == 200
+    assert '"2 queries"' in response.headers["Server-Timing"]
+    assert 'db-dup;desc="1 duplicate"' in response.headers["Server-Timing"]
+
+
+def test_query_budget_fails_in_strict_mode():
+    with TestClient(profiled_app()) as client:
+        with pytest.raises(QueryBudgetExceeded, match="ran 2 queries, budget is 1"):
+            client.get("/over")
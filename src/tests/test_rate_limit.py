@@ -0,0 +1,97 @@
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+from fastapi.testclient import TestClient
+
+from src.core import rate_limit
+from src.core.hashing import password_hasher
+from src.core.rate_limit import SlidingWindowLimit, parse_rate
+from src.main import app
+from src.modules.auth.routes import auth
+from src.settings import Settings
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: client)
+    return client
+
+
+def test_parse_rate():
+    assert parse_rate("10/m") == (10, 60.0)
+    assert parse_rate("5/second") == (5, 1.0)
+    assert parse_rate("") == (0, 0.0)
+    with pytest.raises(ValueError):
+        parse_rate("30/min2")
+
+
+@pytest.mark.parametrize("rate", ["abc", "30/min2", "30/d", "/m"])
+def test_malformed_rates_fail_settings_validation(monkeypatch, rate):
+    monkeypatch.setenv("LOGIN_RATE_LIMIT_IP", rate)
+
+    with pytest.raises(ValidationError, match="LOGIN_RATE_LIMIT_IP|login_rate_limit_ip"):
+        Settings()
+
+
+def test_sliding_window_rejects_over_limit_without_recording(redis):
+    limit = SlidingWindowLimit("test", "2/m")
+
+    assert limit.hit("a") is None
+    assert limit.hit("a") is None
+    assert 0 < limit.hit("a") <= 60
+    assert redis.zcard(limit.key("a")) == 2
+    assert limit.blocked("a") is not None
+
+    assert limit.hit("b") is None
+    assert limit.blocked("b") is None
+
+
+def test_failed_logins_lock_the_account(redis, monkeypatch):
+    monkeypatch.setattr(auth, "login_account_limit", SlidingWindowLimit("login:account", "2/m"))
+    email = f"test-{uuid4()}@example.com"
+    password = "secret123!"
+
+    with TestClient(app) as client:
+        signup = client.post("/v1/auth/signup", json={"email": email, "password": password})
+        assert signup.status_code == 200
+
+        for _ in range(2):
+            failed = client.post("/v1/auth/login", data={"username": email, "password": "wrong"})
+            assert failed.status_code == 401
+
+        locked = client.post("/v1/auth/login", data={"username": email.upper(), "password": password})
+        assert locked.status_code == 429
+        assert int(locked.headers["Retry-After"]) > 0
+
+
+def test_signup_is_limited_per_ip(redis, monkeypatch):
+    monkeypatch.setattr(auth, "signup_ip_limit", SlidingWindowLimit("signup:ip", "1/m"))
+
+    with TestClient(app) as client:
+        first = client.post(
+            "/v1/auth/signup", json={"email": f"test-{uuid4()}@example.com", "password": "x"}
+        )
+        second = client.post(
+            "/v1/auth/signup", json={"email": f"test-{uuid4()}@example.com", "password": "x"}
+        )
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+
+
+def test_saturated_hashing_budget_rejects_before_any_work(monkeypatch):
+    monkeypatch.setattr(
+        password_hasher, "_admitted", password_hasher.workers + password_hasher.queue_size
+    )
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/v1/auth/login", data={"username": "nobody@example.com", "password": "x"}
+        )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert "0 queries" in response.headers["Server-Timing"]
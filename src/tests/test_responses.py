@@ -0,0 +1,15 @@
+from src.benchmarks.serialization import make_users
+from src.core.http_cache import render_json
+from src.core.responses import FastJSONResponse, dump_json
+from src.modules.users.models.users import UserPublic
+from src.modules.users.selectors import UserSelector
+
+
+def test_projection_renders_the_same_bytes_as_the_response_model():
+    users = make_users(3)
+    rows = UserSelector.project(users, UserPublic)
+
+    assert [set(row) for row in rows] == [{"id", "email", "roles"}] * 3
+    # Same bytes means the same ETag whichever path rendered the page
+    assert dump_json(rows) == render_json(list[UserPublic], users)
+    assert FastJSONResponse(rows).body == dump_json(rows)
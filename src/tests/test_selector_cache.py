@@ -0,0 +1,100 @@
+import asyncio
+import json
+import threading
+from uuid import uuid4
+
+import pytest
+from sqlmodel import Session
+
+from src.core import selector_cache
+from src.core.database import engine
+from src.core.profiler import profile_queries
+from src.core.selector_cache import SelectorCache
+from src.modules.users.models.users import User, UserPublic
+from src.modules.users.selectors import UserSelector
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeRedis()
+    monkeypatch.setattr(selector_cache, "get_redis", lambda: redis)
+    monkeypatch.setattr(SelectorCache, "registry", {})
+
+    cache = SelectorCache(User, ttl=60)
+    monkeypatch.setattr(UserSelector, "cache", cache)
+    return cache
+
+
+def _queries(fn) -> int:
+    with profile_queries() as profile:
+        fn()
+    return profile.queries
+
+
+def test_get_is_served_from_both_tiers_and_invalidated_by_writes(cache):
+    with Session(engine) as session:
+        user = UserSelector.create({"email": f"test-{uuid4()}@example.com", "password": "x"}, session)
+        session.expunge_all()
+
+        assert _queries(lambda: UserSelector.get(user.id, session)) == 1
+        assert _queries(lambda: UserSelector.get(user.id, session)) == 0
+
+        # Another worker: empty L1, same Redis
+        cache.local.clear()
+        cached = UserSelector.get(user.id, session)
+        assert cached.email == user.email
+        assert cached.password == ""
+        assert cached is not UserSelector.get(user.id, session)
+
+        # Password hashes never reach Redis
+        redis = selector_cache.get_redis()
+        keys = redis.keys("selector:user:*:get:*")
+        assert keys
+        assert all("password" not in json.loads(redis.get(key)) for key in keys)
+
+        UserSelector.update(user.id, UserPublic(id=user.id, email=user.email, roles=["admin"]), session)
+        session.expunge_all()
+
+        assert _queries(lambda: UserSelector.get(user.id, session)) == 1
+        assert UserSelector.get(user.id, session).roles == ["admin"]
+
+
+def test_bulk_writes_invalidate_cached_filters(cache):
+    with Session(engine) as session:
+        user = UserSelector.create({"email": f"test-{uuid4()}@example.com", "password": "x"}, session)
+        UserSelector.filter(session, "disabled", True, 0, 100)
+        version = cache.version()
+
+        UserSelector.bulk_update({"disabled": True}, session, ids=[user.id])
+
+        assert cache.version() == version + 1
+        disabled = UserSelector.filter(session, "disabled", True, 0, 100)
+        assert user.id in {item.id for item in disabled}
+
+
+def test_miss_waits_for_the_worker_holding_the_lock(cache):
+    key = cache.key("get:hot")
+    redis = selector_cache.get_redis()
+    redis.set(f"{key}:lock", 1)
+    threading.Timer(0.05, lambda: redis.set(key, json.dumps({"name": "hot"}))).start()
+
+    calls = []
+    data = cache.get_or_load("get:hot", lambda: calls.append(1) or {"name": "db"})
+
+    assert data == {"name": "hot"}
+    assert calls == []
+
+
+def test_missing_rows_release_the_lock(cache):
+    key = cache.key("get:missing")
+    redis = selector_cache.get_redis()
+
+    assert cache.get_or_load("get:missing", lambda: None) is None
+    assert redis.get(f"{key}:lock") is None
+
+    async def missing():
+        return None
+
+    assert asyncio.run(cache.aget_or_load("get:missing", missing)) is None
+    assert redis.get(f"{key}:lock") is None
@@ -0,0 +1,40 @@
+import pytest
+
+from src.core import startup
+from src.core.database import engine
+from src.core.startup import SchemaOutOfDate, alembic_heads, check_schema, fill_pool
+from src.settings import SchemaCheckEnum
+
+
+def test_migrations_have_a_single_head():
+    assert len(alembic_heads()) == 1
+
+
+def test_check_schema_passes_at_head(monkeypatch):
+    monkeypatch.setattr(startup, "database_heads", alembic_heads)
+
+    check_schema(SchemaCheckEnum.strict)
+
+
+def test_check_schema_strict_refuses_an_old_database(monkeypatch):
+    monkeypatch.setattr(startup, "database_heads", lambda: frozenset({"old"}))
+
+    with pytest.raises(SchemaOutOfDate, match="alembic upgrade head"):
+        check_schema(SchemaCheckEnum.strict)
+
+    check_schema(SchemaCheckEnum.warn)
+
+
+def test_check_schema_off_skips_the_database(monkeypatch):
+    def fail():
+        raise AssertionError("database queried")
+
+    monkeypatch.setattr(startup, "database_heads", fail)
+
+    check_schema(SchemaCheckEnum.off)
+
+
+def test_fill_pool_leaves_connections_idle():
+    fill_pool(engine, 2)
+
+    assert engine.pool.checkedin() >= 2
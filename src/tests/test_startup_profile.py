@@ -0,0 +1,24 @@
+from src.core.startup_profile import LAZY_MODULES, parse_importtime, profile
+
+
+def test_parse_importtime_reads_nesting():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |     json.decoder",
+        "import time:       300 |        420 |   json",
+        "some other output",
+    ])
+
+    rows = parse_importtime(stderr)
+
+    assert [(row.module, row.self_us, row.cumulative_us, row.depth) for row in rows] == [
+        ("json.decoder", 120, 120, 2),
+        ("json", 300, 420, 1),
+    ]
+
+
+def test_app_import_leaves_integrations_unloaded():
+    result = profile("src.main")
+
+    assert result["lazy_loaded"] == []
+    assert not {row.module for row in result["imports"]} & set(LAZY_MODULES)